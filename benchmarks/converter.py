@@ -0,0 +1,64 @@
+from argparse import ArgumentParser
+from timeit import repeat
+
+import numpy as np
+
+from smartmeet.utils.converter import Converter
+
+
+def legacy_float_to_int16(data):
+    temp = data.copy()
+    temp[temp > 1.0] = 1.0
+    temp[temp < -1.0] = -1.0
+    temp[temp < 0] *= abs(np.iinfo(np.int16).min)
+    temp[temp > 0] *= abs(np.iinfo(np.int16).max)
+    return temp.astype(dtype=np.int16)
+
+
+def legacy_int16_to_float(data):
+    temp = data.astype(dtype=np.float32)
+    temp[temp < 0] /= float(abs(np.iinfo(np.int16).min))
+    temp[temp > 0] /= float(abs(np.iinfo(np.int16).max))
+    return temp
+
+
+def measure(func, number: int, repetitions: int) -> float:
+    """Returns the best time per call in microseconds"""
+    return min(repeat(func, number=number, repeat=repetitions)) / number * 1e6
+
+
+def main():
+    parser = ArgumentParser(description='Compares the legacy sample conversions with the allocation-free ones.')
+    parser.add_argument('-s', '--sample-rate', dest='rate', type=int, default=16000, help='Sampling rate in Hz')
+    parser.add_argument('-c', '--channels', dest='channels', type=int, default=2, help='Number of channels')
+    parser.add_argument('-n', '--number', dest='number', type=int, default=2000, help='Calls per measure')
+    parser.add_argument('-b', '--batch', dest='batch', type=int, default=100, help='Frames per batch conversion')
+    args = parser.parse_args()
+
+    frames = args.rate // 100
+    data = np.random.RandomState(0).uniform(-1.2, 1.2, (frames, args.channels)).astype(np.float32)
+    fixed = Converter.fromFloatToInt16(data)
+    as_int16 = np.empty_like(fixed)
+    as_float = np.empty_like(data)
+    batch = np.repeat(data[np.newaxis], args.batch, axis=0)
+    batch_out = np.empty(batch.shape, dtype=np.int16)
+
+    cases = [
+        ("float -> int16 (legacy)", lambda: legacy_float_to_int16(data), 1),
+        ("float -> int16 (out=)", lambda: Converter.fromFloatToInt16(data, out=as_int16), 1),
+        ("int16 -> float (legacy)", lambda: legacy_int16_to_float(fixed), 1),
+        ("int16 -> float (out=)", lambda: Converter.fromInt16ToFloat(fixed, out=as_float), 1),
+        ("float -> int16 (legacy, %d frames)" % args.batch, lambda: [legacy_float_to_int16(f) for f in batch],
+         args.batch),
+        ("float -> int16 (batch, %d frames)" % args.batch, lambda: Converter.batchFromFloatToInt16(batch, batch_out),
+         args.batch),
+    ]
+
+    print("Frame of %d x %d samples (10 ms at %d Hz)" % (frames, args.channels, args.rate))
+    for label, func, count in cases:
+        elapsed = measure(func, number=max(1, args.number // count), repetitions=5)
+        print("%-40s %10.2f us/call %10.3f us/frame" % (label, elapsed, elapsed / count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import warnings
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+from scipy import signal
+
+from smartmeet.filter.rolling_median import RollingMedian
+
+
+def run_medfilt(data: np.ndarray, kernel_size: int, chunk: int) -> float:
+    """Filters every chunk independently with scipy.signal.medfilt, as the previous implementation did"""
+    with warnings.catch_warnings():
+        # medfilt warns when the kernel is longer than the chunk
+        warnings.simplefilter("ignore")
+        start = perf_counter()
+        for i in range(0, len(data), chunk):
+            signal.medfilt(data[i:i + chunk], kernel_size=kernel_size)
+        return perf_counter() - start
+
+
+def run_streaming(data: np.ndarray, kernel_size: int, chunk: int) -> float:
+    """Filters the chunks with the sliding-window RollingMedian"""
+    median = RollingMedian(kernel_size=kernel_size)
+    start = perf_counter()
+    for i in range(0, len(data), chunk):
+        median.process(data[i:i + chunk])
+    return perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description='Compares the streaming RollingMedian with chunk-wise scipy.signal.medfilt.')
+    parser.add_argument('-s', '--sample-rate', dest='rate', type=int, default=16000, help='Sampling rate in Hz')
+    parser.add_argument('-d', '--duration', dest='duration', type=float, default=5.0, help='Signal duration in seconds')
+    parser.add_argument('-c', '--chunk', dest='chunk', type=int, default=160, help='Samples per chunk')
+    parser.add_argument('-k', '--kernels', dest='kernels', type=int, nargs='+', default=[5, 51, 501, 2001, 8001],
+                        help='Kernel sizes to measure')
+    args = parser.parse_args()
+
+    data = np.random.RandomState(0).randn(int(args.rate * args.duration))
+    print("%d samples in chunks of %d samples" % (len(data), args.chunk))
+    print("%8s %14s %14s %14s %14s" % ("kernel", "medfilt (s)", "medfilt RTF", "streaming (s)", "streaming RTF"))
+    for kernel_size in args.kernels:
+        medfilt = run_medfilt(data, kernel_size, args.chunk)
+        streaming = run_streaming(data, kernel_size, args.chunk)
+        print("%8d %14.4f %14.4f %14.4f %14.4f" %
+              (kernel_size, medfilt, medfilt / args.duration, streaming, streaming / args.duration))
+
+
+if __name__ == '__main__':
+    main()
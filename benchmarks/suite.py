@@ -0,0 +1,273 @@
+import atexit
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from collections import OrderedDict
+from math import gcd
+from time import perf_counter
+
+import numpy as np
+import soundfile
+
+from smartmeet.core.reframer import Reframer
+from smartmeet.core.sink import Sink
+from smartmeet.core.transform import Transform
+from smartmeet.filter.dc_removal import DCRemoval
+from smartmeet.filter.detrend import Detrend
+from smartmeet.filter.pre_emphasis import PreEmphasis
+from smartmeet.filter.rolling_mean import RollingMean
+from smartmeet.filter.rolling_median import RollingMedian
+from smartmeet.filter.smooth import Smooth
+from smartmeet.io.array_source import ArraySource
+from smartmeet.io.decoder import Decoder
+from smartmeet.io.encoder import Encoder
+from smartmeet.tools.downmix import DownMix
+from smartmeet.tools.resample import Resample
+from smartmeet.utils.converter import Converter
+
+SCRATCH = tempfile.mkdtemp(prefix="smartmeet-benchmarks-")
+atexit.register(shutil.rmtree, SCRATCH, True)
+
+
+class NullSink(Sink):
+    """Discards the data at the end of a benchmarked chain"""
+
+    def process(self, data, extra):
+        pass
+
+
+def dereverb(rate: int, channels: int, frames: int):
+    # nara_wpe is an optional dependency, the case is skipped when it is not installed
+    from smartmeet.modules.dereverb import DeReverb
+    return DeReverb(online=True)
+
+
+def aec(rate: int, channels: int, frames: int):
+    # speexdsp is an optional dependency, the case is skipped when it is not installed
+    from smartmeet.modules.aec import AEC
+    canceller = AEC(channels=channels, rate=rate, frames_per_channel=frames, filter_length=rate // 10)
+    playback = np.random.RandomState(1).uniform(-0.5, 0.5, frames).astype(np.float32)
+    # The canceller only accepts whole buffers, so the last partial buffer of the signal is held back
+    return [Reframer(frame_size=frames), Transform(lambda data: canceller.process(data, playback))]
+
+
+def encoder(rate: int, channels: int, frames: int):
+    return Encoder(os.path.join(SCRATCH, "output-%d-%d.wav" % (rate, channels)), rate=rate, channels=channels)
+
+
+def decoder(rate: int, channels: int, frames: int, data: np.ndarray):
+    path = os.path.join(SCRATCH, "input-%d-%d-%d.wav" % (rate, channels, len(data)))
+    if not os.path.exists(path):
+        soundfile.write(path, data, rate, subtype="FLOAT")
+    return Decoder(path, frames_per_buffer=frames)
+
+
+def noise_suppressor(rate: int, channels: int, frames: int):
+    # webrtc_audio_processing is an optional dependency, the case is skipped when it is not installed
+    from smartmeet.modules.noise_suppression import NoiseSuppressor
+    return [Reframer(frame_size=rate // 100),
+            Transform(NoiseSuppressor(rate=rate, channels=channels, reuse_buffers=True))]
+
+
+def vad(rate: int, channels: int, frames: int):
+    # webrtcvad is an optional dependency, the case is skipped when it is not installed
+    from smartmeet.modules.vad import VAD
+    return [Transform(DownMix(reuse_buffers=True)),
+            Reframer(frame_size=rate * 30 // 1000),
+            Transform(VAD(rate=rate))]
+
+
+def resample_vad(rate: int, channels: int, frames: int):
+    # Capture at the rate of the case and detect the voice at 16 kHz, as a 48 kHz recording path does
+    from smartmeet.modules.vad import VAD
+    factor = gcd(rate, 16000)
+    return [Transform(DownMix(reuse_buffers=True)),
+            Transform(Resample(up=16000 // factor, down=rate // factor)),
+            Reframer(frame_size=480),
+            Transform(VAD(rate=16000))]
+
+
+def converter(rate: int, channels: int, frames: int):
+    out = np.empty(shape=[frames, channels], dtype=np.int16)
+    return lambda data: Converter.fromFloatToInt16(data, out=out[:len(data)])
+
+
+ELEMENTS = OrderedDict([
+    ("converter", converter),
+    ("dc_removal", lambda rate, channels, frames: DCRemoval(rate=rate)),
+    ("detrend", lambda rate, channels, frames: Detrend(streaming=True)),
+    ("pre_emphasis", lambda rate, channels, frames: PreEmphasis()),
+    ("smooth", lambda rate, channels, frames: Smooth(kernel_size=31, polyorder=3)),
+    ("rolling_mean", lambda rate, channels, frames: RollingMean(kernel_size=15)),
+    ("rolling_median", lambda rate, channels, frames: RollingMedian(kernel_size=15)),
+    ("downmix", lambda rate, channels, frames: DownMix(reuse_buffers=True)),
+    ("resample", lambda rate, channels, frames: Resample(up=1, down=2)),
+    ("encoder", encoder),
+    ("dereverb", dereverb),
+])
+
+SOURCES = OrderedDict([
+    ("decoder", decoder),
+])
+
+CHAINS = OrderedDict([
+    ("pipeline_dispatch", lambda rate, channels, frames: [Transform(lambda data: data) for _ in range(4)]),
+    ("cleanup_chain", lambda rate, channels, frames: [Transform(DCRemoval(rate=rate)),
+                                                      Transform(PreEmphasis()),
+                                                      Transform(Smooth(kernel_size=31, polyorder=3))]),
+    ("reframer", lambda rate, channels, frames: [Reframer(frame_size=rate // 100, hop=rate // 200)]),
+    ("noise_suppressor", noise_suppressor),
+    ("vad", vad),
+    ("aec", aec),
+    ("resample_vad", resample_vad),
+])
+
+CASES = list(ELEMENTS) + list(SOURCES) + list(CHAINS)
+
+
+def build(case: str, rate: int, channels: int, frames: int, data: np.ndarray):
+    """Returns a callable processing the next buffer of the data every time it is called
+
+    Elements process the buffers directly, chains are linked after an ArraySource and driven as a pipeline does.
+    Sources read the data from their own input, for instance a file storing it, and feed a sink discarding it.
+    """
+    if case in ELEMENTS:
+        func = ELEMENTS[case](rate, channels, frames)
+        func = getattr(func, "process", func)
+        buffers = iter([data[i:i + frames] for i in range(0, len(data), frames)])
+        return lambda: func(next(buffers))
+
+    if case in SOURCES:
+        source = SOURCES[case](rate, channels, frames, data)
+        elements = []
+    else:
+        source = ArraySource(data, rate=rate, frames_per_buffer=frames)
+        elements = CHAINS[case](rate, channels, frames)
+    producer = source
+    for element in elements + [NullSink()]:
+        producer.link(element)
+        producer = element
+    source.start()
+    return source.run
+
+
+def measure(case: str, rate: int, channels: int, frames: int, data: np.ndarray, repetitions: int) -> dict:
+    """Runs a case over the data and returns its best time, throughput, real-time factor and allocations"""
+    count = (len(data) + frames - 1) // frames
+    elapsed = float("inf")
+    for _ in range(repetitions):
+        step = build(case, rate, channels, frames, data)
+        start = perf_counter()
+        for _ in range(count):
+            step()
+        elapsed = min(elapsed, perf_counter() - start)
+
+    # Allocations are measured in a separate run, as tracing slows down the processing
+    step = build(case, rate, channels, frames, data)
+    reset_peak = getattr(tracemalloc, "reset_peak", None)
+    allocated = 0
+    tracemalloc.start()
+    try:
+        if reset_peak is None:
+            # Before Python 3.9 only the peak of the whole run is available
+            baseline = tracemalloc.get_traced_memory()[0]
+            for _ in range(count):
+                step()
+            allocated = (tracemalloc.get_traced_memory()[1] - baseline) / float(count)
+        else:
+            for _ in range(count):
+                reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                step()
+                allocated += tracemalloc.get_traced_memory()[1] - baseline
+            allocated /= float(count)
+    finally:
+        tracemalloc.stop()
+
+    duration = len(data) / float(rate)
+    return {
+        "elapsed": elapsed,
+        "throughput": len(data) / elapsed,
+        "rtf": elapsed / duration,
+        "bytes_per_buffer": allocated,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns the cases whose real-time factor exceeds the one of the baseline by more than the threshold"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if reference and result["rtf"] > reference["rtf"] * (1.0 + threshold):
+            regressions.append((key, reference["rtf"], result["rtf"]))
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = ArgumentParser(description='Measures the throughput, real-time factor and allocations of the elements.')
+    parser.add_argument('-e', '--cases', dest='cases', nargs='+', default=CASES,
+                        choices=CASES, help='Elements and chains to measure')
+    parser.add_argument('-s', '--sample-rates', dest='rates', type=int, nargs='+', default=[8000, 16000, 48000],
+                        help='Sampling rates in Hz')
+    parser.add_argument('-c', '--channels', dest='channels', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of channels')
+    parser.add_argument('-f', '--frame-sizes', dest='frame_sizes', type=float, nargs='+', default=[10, 20, 30],
+                        help='Buffer durations in milliseconds')
+    parser.add_argument('-d', '--duration', dest='duration', type=float, default=1.0, help='Signal duration in seconds')
+    parser.add_argument('-r', '--repetitions', dest='repetitions', type=int, default=3, help='Runs per measure')
+    parser.add_argument('--save', dest='save', type=str, help='Stores the results as a JSON baseline')
+    parser.add_argument('--compare', dest='compare', type=str, help='JSON baseline to compare the results with')
+    parser.add_argument('--threshold', dest='threshold', type=float, default=0.2,
+                        help='Maximum relative increase of the real-time factor before failing')
+    args = parser.parse_args(argv)
+
+    results = OrderedDict()
+    skipped = set()
+    print("%-20s %6s %3s %6s %14s %10s %14s" % ("case", "rate", "ch", "frames", "frames/s", "RTF", "bytes/buffer"))
+    for rate, channels in itertools.product(args.rates, args.channels):
+        data = np.random.RandomState(0).uniform(-0.5, 0.5, (int(rate * args.duration), channels)).astype(np.float32)
+        for case, size in itertools.product(args.cases, args.frame_sizes):
+            if case in skipped:
+                continue
+            frames = int(rate * size / 1000.0)
+            try:
+                result = measure(case, rate, channels, frames, data, args.repetitions)
+            except ImportError as error:
+                print("%-20s skipped: %s" % (case, error))
+                skipped.add(case)
+                continue
+            key = "%s/%d/%d/%d" % (case, rate, channels, frames)
+            results[key] = result
+            print("%-20s %6d %3d %6d %14.0f %10.5f %14.1f" %
+                  (case, rate, channels, frames, result["throughput"], result["rtf"], result["bytes_per_buffer"]))
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "results": results,
+            }, file, indent=2)
+        print("Baseline stored in %s" % args.save)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for key, reference, current in regressions:
+            print("REGRESSION %s: RTF %.5f -> %.5f (%+.1f%%)" % (key, reference, current, 100.0 * (current / reference - 1)))
+        if regressions:
+            return 1
+        print("No regression above %.0f%% against %s" % (100 * args.threshold, args.compare))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
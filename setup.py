@@ -33,7 +33,9 @@ setup(
     packages=find_packages(exclude=['contrib', 'docs', 'tests']),
     install_requires=requirements,
     entry_points={
-        'console_scripts': [],
+        'console_scripts': [
+            'smartmeet-batch=smartmeet.tools.batch:main',
+        ],
     },
     project_urls={
         'Bug Reports': '',
@@ -0,0 +1,66 @@
+from smartmeet.core.logger import Logger
+
+
+class Deadline:
+    """Checks that the processing of every buffer finishes within its period.
+
+    In push mode the pipeline runs inside the callback of the producer, so processing a buffer must take less time
+    than the buffer duration, otherwise the producer falls behind and the device will eventually drop data. Overruns
+    are counted and reported through the Logger. To avoid flooding the log from a real-time thread, only the 1st,
+    2nd, 4th, 8th... overruns are logged.
+    """
+
+    def __init__(self, label: str = ""):
+        """
+        Args:
+            label (str): Name used when reporting overruns
+        """
+        self.__label = label
+        self.__checks = 0
+        self.__overruns = 0
+        self.__worst = 0.0
+
+    @property
+    def checks(self) -> int:
+        """Returns the number of checked buffers"""
+        return self.__checks
+
+    @property
+    def overruns(self) -> int:
+        """Returns the number of buffers processed after their deadline"""
+        return self.__overruns
+
+    @property
+    def worst(self) -> float:
+        """Returns the worst ratio between processing time and buffer period"""
+        return self.__worst
+
+    def reset(self):
+        """Clears the counters"""
+        self.__checks = 0
+        self.__overruns = 0
+        self.__worst = 0.0
+
+    def check(self, elapsed: float, period: float) -> bool:
+        """Checks the processing time of a buffer against its period
+
+        Args:
+            elapsed (float): Time spent processing the buffer, in seconds
+            period (float): Duration of the buffer, in seconds
+
+        Returns:
+            True if the buffer has been processed in time, false otherwise
+        """
+        self.__checks += 1
+        load = elapsed / period
+        if load > self.__worst:
+            self.__worst = load
+        if load <= 1.0:
+            return True
+
+        self.__overruns += 1
+        if self.__overruns & (self.__overruns - 1) == 0:
+            Logger().warning(
+                "%s: processing took %.3f ms for a buffer of %.3f ms (%d overruns in %d buffers)" %
+                (self.__label, elapsed * 1e3, period * 1e3, self.__overruns, self.__checks), "deadline")
+        return False
@@ -0,0 +1,88 @@
+from concurrent.futures import wait
+
+import numpy as np
+
+
+class FanOut:
+    """Delivery of a chunk of data to the sinks linked to an element.
+
+    The sinks of an element share the chunk it produces. When there is a single
+    sink, it owns the chunk and receives it untouched, so it may modify the
+    samples in place. When the chunk is fanned out to several sinks, each of
+    them receives a read-only view of the same memory and its own copy of the
+    extra information. A sink needing to write the samples asks for a copy with
+    `writable`, which only copies read-only data, so the elements do not need
+    to copy their inputs defensively.
+
+    The sinks of a fan-out are independent, so they may also run at the same
+    time on an executor. The call returns once every sink has processed the
+    chunk, as the producer may reuse its memory afterwards. The calling thread
+    does not sit idle meanwhile: it runs the last sink itself, and then every
+    sink no worker has started yet. Several elements, even nested fan-outs,
+    can thus share the same bounded executor without a deadlock, as a fan-out
+    never waits for a sink queued behind the worker running it.
+    """
+
+    @staticmethod
+    def share(data):
+        """Returns a read-only view of the data, or the data itself if it is not an array
+
+        Args:
+            data: Chunk of data, generally a numpy array storing audio samples
+        """
+        if not isinstance(data, np.ndarray) or not data.flags.writeable:
+            return data
+        view = data.view()
+        view.flags.writeable = False
+        return view
+
+    @staticmethod
+    def writable(data):
+        """Returns the data if it can be modified in place, a copy otherwise
+
+        Args:
+            data: Chunk of data, generally a numpy array storing audio samples
+        """
+        if isinstance(data, np.ndarray) and not data.flags.writeable:
+            return data.copy()
+        return data
+
+    @staticmethod
+    def propagate(sinks: list, data, extra, executor=None):
+        """Runs the sinks with a chunk of data
+
+        Args:
+            sinks (list): Sinks linked to the producer
+            data: Chunk of data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+            executor: Optional concurrent.futures.Executor running the sinks of a fan-out in parallel
+        """
+        if len(sinks) == 1:
+            sinks[0].run(data, extra)
+            return
+
+        shared = FanOut.share(data)
+        if executor is None:
+            for sink in sinks:
+                sink.run(shared, FanOut.__copy(extra))
+            return
+
+        jobs = [(sink, FanOut.__copy(extra)) for sink in sinks]
+        futures = [executor.submit(sink.run, shared, info) for sink, info in jobs[:-1]]
+        try:
+            jobs[-1][0].run(shared, jobs[-1][1])
+            for future, (sink, info) in zip(futures, jobs):
+                if future.cancel():
+                    sink.run(shared, info)
+        finally:
+            # Cancelled futures are only marked as done once a worker discards them, so only the started ones are
+            # waited for. After an error the sinks not started yet are skipped.
+            started = [future for future in futures if not future.cancel()]
+            wait(started)
+        for future in started:
+            future.result()
+
+    @staticmethod
+    def __copy(extra):
+        """Returns a shallow copy of the extra information for a sink of a fan-out"""
+        return dict(extra) if isinstance(extra, dict) else extra
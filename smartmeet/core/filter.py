@@ -1,7 +1,8 @@
 from abc import abstractmethod
+from time import perf_counter
 
-from profilehooks import profile
-
+from smartmeet.core.fanout import FanOut
+from smartmeet.core.instrumentation import Instrumentation
 from smartmeet.core.sink import Sink
 
 
@@ -19,6 +20,24 @@ class Filter(Sink):
         """
         super().__init__(name)
         self.__sinks = []
+        self.__executor = None
+
+    @property
+    def executor(self):
+        """Returns the executor running the linked sinks in parallel, if any"""
+        return self.__executor
+
+    @executor.setter
+    def executor(self, executor):
+        """Runs the linked sinks in parallel on the given executor
+
+        The sinks receive a read-only view of the data, and the element waits
+        until all of them have processed it.
+
+        Args:
+            executor: A concurrent.futures.Executor, or None to run the sinks in order
+        """
+        self.__executor = executor
 
     @abstractmethod
     def process(self, data, extra) -> tuple:
@@ -65,23 +84,44 @@ class Filter(Sink):
             data: Input data, generally a numpy array storing audio samples
             extra: Dictionary with any extra information
         """
-        data, extra = self.__run_processing(data, extra)
+        if Instrumentation.enabled:
+            data, extra = self.__run_processing(data, extra)
+        else:
+            data, extra = self.process(data, extra)
         self.__propagate(data, extra)
 
-    @profile
-    def __run_processing(self, data, extra):
+    def push(self, data, extra=None):
+        """Sends a chunk of data to the different connected sinks
+
+        Filters producing a number of chunks different from the number of
+        chunks they receive use this function to propagate each of them.
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
         """
+        self.__propagate(data, extra)
+
+    def __run_processing(self, data, extra):
+        """Measures the execution of the main processing callback
+
         Args:
             data:
             extra:
         """
-        return self.process(data, extra)
+        start = perf_counter()
+        result = self.process(data, extra)
+        Instrumentation.record(self.name or type(self).__name__, perf_counter() - start, data, extra)
+        return result
 
     def __propagate(self, data, extra):
-        """
+        """Runs the linked sinks with the data
+
+        A single sink owns the data, several sinks share a read-only view of
+        it.
+
         Args:
             data:
             extra:
         """
-        for sink in self.__sinks:
-            sink.run(data, extra)
+        FanOut.propagate(self.__sinks, data, extra, self.__executor)
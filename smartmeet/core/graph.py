@@ -0,0 +1,222 @@
+import threading
+
+from smartmeet.core.element import Element
+from smartmeet.core.filter import Filter
+from smartmeet.core.join import Join
+from smartmeet.core.pipeline import Pipeline
+from smartmeet.core.sink import Sink
+from smartmeet.core.source import Source
+from smartmeet.core.stage import Backpressure, Stage
+
+
+class Graph:
+    """ This class executes a directed acyclic graph of Elements
+
+    Unlike a Pipeline, which chains its elements one after the other, a graph links them as described by `connect`.
+    An element may feed several elements (fan-out). Several elements may only feed the same one (fan-in) through a
+    Join element, connecting every producer to one of its ports, as the producers run on different threads and the
+    join is the element aligning and serializing their streams. This is the case of the microphone and loopback
+    signals of an echo canceller.
+
+    Every source runs on its own thread. In parallel mode every branch of a fan-out also runs on its own worker
+    thread (see Stage), so independent branches, for instance a 48 kHz recording path and a 16 kHz VAD path, are
+    processed at the same time on different cores.
+
+    Note:
+        The elements are linked when the graph runs and unlinked when it finishes, so a graph can be modified and
+        run again.
+    """
+
+    def __init__(self,
+                 name: str = "default",
+                 parallel: bool = False,
+                 queue_size: int = 8,
+                 backpressure: Backpressure = Backpressure.BLOCK):
+        """
+        Args:
+            name (str): Graph's name
+            parallel (bool): Runs every branch of a fan-out on its own worker thread
+            queue_size (int): Maximum number of chunks queued by every branch in parallel mode
+            backpressure (Backpressure): Policy applied when the queue of a branch is full
+        """
+        self.__name = name
+        self.__parallel = parallel
+        self.__queue_size = queue_size
+        self.__backpressure = Backpressure(backpressure)
+        self.__elements = []
+        self.__edges = []
+        self.__stages = []
+        self.__links = []
+
+    @property
+    def name(self) -> str:
+        """Returns the name of the graph"""
+        return self.__name
+
+    @property
+    def parallel(self) -> bool:
+        """Checks if the branches of the graph run on their own worker threads"""
+        return self.__parallel
+
+    @property
+    def elements(self) -> tuple:
+        """Returns the elements of the graph, in insertion order"""
+        return tuple(self.__elements)
+
+    @property
+    def sources(self) -> tuple:
+        """Returns the source elements of the graph"""
+        return tuple(element for element in self.__elements if issubclass(type(element), Source))
+
+    @property
+    def edges(self) -> tuple:
+        """Returns the connections of the graph as (producer, consumer, port) tuples"""
+        return tuple(self.__edges)
+
+    @property
+    def stages(self) -> tuple:
+        """Returns the stages wrapping the branches in the last run in parallel mode"""
+        return tuple(self.__stages)
+
+    def add(self, element: Element) -> Element:
+        """ Adds an element to the graph
+        Args:
+            element (Element): Element to add to the graph
+        Returns:
+            The added element
+        """
+        if not issubclass(type(element), Element):
+            raise TypeError("Only Elements can be part of a graph")
+        if element in self.__elements:
+            raise ValueError("The element already exist in the graph")
+        self.__elements.append(element)
+        return element
+
+    def connect(self, producer: Element, consumer: Element, port: str = None):
+        """ Sends the output of an element to another element
+        Args:
+            producer (Element): Source or Filter generating the data
+            consumer (Element): Sink or Filter receiving the data
+            port (str): Input of the consumer receiving the data, only for Join elements
+        Note:
+            Elements not yet in the graph are added. Every element, or port of a Join, has a single producer.
+        """
+        if not issubclass(type(producer), (Source, Filter)):
+            raise TypeError("Only Source and Filter elements can produce data")
+        if not issubclass(type(consumer), Sink):
+            raise TypeError("Only Sink and Filter elements can consume data")
+        if isinstance(consumer, Join):
+            consumer.input(port)
+        elif port is not None:
+            raise ValueError("Only Join elements have ports")
+        if (producer, consumer, port) in self.__edges:
+            raise ValueError("The elements are already connected")
+        if any(edge[1] is consumer and edge[2] == port for edge in self.__edges):
+            raise ValueError("The consumer already has a producer, several producers must be merged by a Join")
+
+        for element in (producer, consumer):
+            if element not in self.__elements:
+                self.add(element)
+        self.__edges.append((producer, consumer, port))
+        try:
+            self.__sort()
+        except ValueError:
+            self.__edges.pop()
+            raise
+
+    def disconnect(self, producer: Element, consumer: Element, port: str = None):
+        """ Removes a connection between two elements
+        Args:
+            producer (Element): Source or Filter generating the data
+            consumer (Element): Sink or Filter receiving the data
+            port (str): Input of the consumer receiving the data, only for Join elements
+        """
+        self.__edges.remove((producer, consumer, port))
+
+    def run(self, push: bool = False):
+        """ Runs every source of the graph until the end of their streaming and processing tasks.
+        Args:
+            push (bool): Lets the sources supporting it drive the graph from their own callback
+        Returns:
+            A boolean representing if every source has been executed successfully.
+        """
+        sources = self.sources
+        if not sources:
+            return False
+
+        self.__build()
+        results = dict()
+        errors = []
+
+        def execute(source: Source):
+            try:
+                results[source] = Pipeline.exec(source=source, push=push and source.supports_push)
+            except Exception as error:
+                errors.append(error)
+                for other in sources:
+                    if other is not source:
+                        other.stop()
+
+        for stage in self.__stages:
+            stage.start()
+        try:
+            threads = [threading.Thread(target=execute, args=(source, ), name="smartmeet-graph-%s" % source.name,
+                                        daemon=True) for source in sources]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            # Stages are stopped following the topological order, so every branch drains its queue before the
+            # elements placed after it receive the stop token.
+            for stage in self.__stages:
+                stage.stop()
+            self.__teardown()
+
+        if errors:
+            raise errors[0]
+        for stage in self.__stages:
+            if stage.error is not None:
+                raise stage.error
+        return all(results.get(source, False) for source in sources)
+
+    def __sort(self) -> list:
+        """Returns the elements in topological order, raising a ValueError if the connections have a cycle"""
+        incoming = dict((element, 0) for element in self.__elements)
+        for _, consumer, _ in self.__edges:
+            incoming[consumer] += 1
+        ready = [element for element in self.__elements if not incoming[element]]
+        order = []
+        while ready:
+            element = ready.pop(0)
+            order.append(element)
+            for producer, consumer, _ in self.__edges:
+                if producer is element:
+                    incoming[consumer] -= 1
+                    if not incoming[consumer]:
+                        ready.append(consumer)
+        if len(order) != len(self.__elements):
+            raise ValueError("The connections of a graph can not have cycles")
+        return order
+
+    def __build(self):
+        """Links the elements, wrapping every branch of a fan-out in a Stage in parallel mode"""
+        self.__teardown()
+        order = self.__sort()
+        stages = []
+        for producer in order:
+            edges = [edge for edge in self.__edges if edge[0] is producer]
+            for _, consumer, port in edges:
+                target = consumer.input(port) if isinstance(consumer, Join) else consumer
+                if self.__parallel and len(edges) > 1:
+                    target = Stage(sink=target, queue_size=self.__queue_size, backpressure=self.__backpressure)
+                    stages.append((order.index(consumer), target))
+                producer.link(target)
+                self.__links.append((producer, target))
+        self.__stages = [stage for _, stage in sorted(stages, key=lambda item: item[0])]
+
+    def __teardown(self):
+        """Unlinks the elements linked by the previous run"""
+        for producer, target in self.__links:
+            producer.unlink(target)
+        self.__links = []
@@ -0,0 +1,181 @@
+import operator
+import threading
+
+import numpy as np
+
+from smartmeet.core.profiler import Profiler
+
+
+class LatencyHistory:
+    """Fixed-size ring buffer storing the most recent call latencies of an element.
+
+    The storage is allocated once, so recording a measure never allocates memory. Percentiles are computed over the
+    last `capacity` calls, while the call counter, the worst case and the real-time factor cover the whole run.
+
+    An element may run on several threads, for instance the branches of a fan-out executor, so the measures are
+    recorded and read under a lock.
+    """
+
+    def __init__(self, label: str, capacity: int = 4096):
+        """
+        Args:
+            label (str): Name of the measured element
+            capacity (int): Number of latencies kept in the ring buffer
+        """
+        if capacity < 1:
+            raise ValueError("The capacity must be a positive number")
+        self.__label = label
+        self.__latencies = np.zeros(shape=[capacity], dtype=np.float64)
+        self.__index = 0
+        self.__calls = 0
+        self.__worst = 0.0
+        self.__busy = 0.0
+        self.__audio = 0.0
+        self.__lock = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        return self.__label
+
+    @property
+    def calls(self) -> int:
+        """Returns the number of recorded calls"""
+        return self.__calls
+
+    @property
+    def worst(self) -> float:
+        """Returns the maximum latency in seconds"""
+        return self.__worst
+
+    @property
+    def rtf(self):
+        """Returns the real-time factor: processing time divided by the duration of the processed audio"""
+        return self.__busy / self.__audio if self.__audio > 0 else None
+
+    def record(self, elapsed: float, duration: float = 0.0):
+        """Stores a new measure
+
+        Args:
+            elapsed (float): Time spent processing the chunk, in seconds
+            duration (float): Duration of the processed audio chunk, in seconds
+        """
+        with self.__lock:
+            self.__latencies[self.__index] = elapsed
+            self.__index = (self.__index + 1) % self.__latencies.size
+            self.__calls += 1
+            self.__busy += elapsed
+            self.__audio += duration
+            if elapsed > self.__worst:
+                self.__worst = elapsed
+
+    def percentiles(self, q=(50, 95, 99)):
+        """Returns the requested percentiles of the stored latencies in seconds
+
+        Args:
+            q: Sequence of percentiles in the range [0, 100]
+        """
+        with self.__lock:
+            stored = self.__latencies[:min(self.__calls, self.__latencies.size)].copy()
+        if not stored.size:
+            return [0.0] * len(q)
+        return list(np.percentile(stored, q))
+
+    def summary(self) -> dict:
+        """Returns a dictionary with the statistics of the element"""
+        p50, p95, p99 = self.percentiles()
+        with self.__lock:
+            return {
+                "label": self.__label,
+                "calls": self.__calls,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "max": self.__worst,
+                "rtf": self.rtf,
+            }
+
+
+class Instrumentation:
+    """Switchable per-element timing of a pipeline.
+
+    Elements only check the `enabled` flag before running their processing callback, so the instrumentation costs a
+    single attribute lookup while it is disabled. Once enabled, the latency of every call is stored in a preallocated
+    LatencyHistory per element name.
+
+    The real-time factor is computed when the elements receive the sampling rate in the `rate` entry of the extra
+    information, as the audio duration of a chunk is its number of frames divided by that rate.
+
+    Every latency is also recorded in the Profiler under the same label, so the measures of the elements are exported
+    by its snapshot, JSON and Prometheus reports.
+    """
+
+    enabled = False
+
+    __capacity = 4096
+    __histories = dict()
+    __lock = threading.Lock()
+
+    @staticmethod
+    def enable(capacity: int = 4096):
+        """Enables the instrumentation
+
+        Args:
+            capacity (int): Number of latencies kept per element
+        """
+        Instrumentation.__capacity = capacity
+        Instrumentation.enabled = True
+
+    @staticmethod
+    def disable():
+        """Disables the instrumentation, the recorded measures are kept"""
+        Instrumentation.enabled = False
+
+    @staticmethod
+    def reset():
+        """Discards every recorded measure"""
+        with Instrumentation.__lock:
+            Instrumentation.__histories = dict()
+
+    @staticmethod
+    def history(label: str) -> LatencyHistory:
+        """Returns the latency history of the given element, creating it if needed
+
+        Args:
+            label (str): Name of the element
+        """
+        history = Instrumentation.__histories.get(label)
+        if history is None:
+            with Instrumentation.__lock:
+                history = Instrumentation.__histories.setdefault(
+                    label, LatencyHistory(label=label, capacity=Instrumentation.__capacity))
+        return history
+
+    @staticmethod
+    def record(label: str, elapsed: float, data=None, extra=None):
+        """Records the latency of a call
+
+        Args:
+            label (str): Name of the element
+            elapsed (float): Time spent processing the chunk, in seconds
+            data: Processed chunk, used to compute its duration
+            extra: Dictionary with any extra information
+        """
+        duration = 0.0
+        if isinstance(extra, dict) and extra.get("rate") and hasattr(data, "shape") and data.shape:
+            duration = data.shape[0] / float(extra["rate"])
+        Instrumentation.history(label).record(elapsed=elapsed, duration=duration)
+        Profiler().record(label, elapsed)
+
+    @staticmethod
+    def report() -> list:
+        """Returns the statistics of every measured element"""
+        with Instrumentation.__lock:
+            histories = sorted(Instrumentation.__histories.values(), key=operator.attrgetter("label"))
+        return [history.summary() for history in histories]
+
+    @staticmethod
+    def print():
+        for entry in Instrumentation.report():
+            rtf = "-" if entry["rtf"] is None else "%f" % entry["rtf"]
+            print("Label: %s \t Calls: %d \t p50: %f \t p95: %f \t p99: %f \t Max: %f \t RTF: %s" %
+                  (entry["label"], entry["calls"], entry["p50"], entry["p95"], entry["p99"], entry["max"], rtf))
@@ -0,0 +1,215 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+from smartmeet.core.filter import Filter
+from smartmeet.core.pool import BufferPool
+from smartmeet.core.sink import Sink
+from smartmeet.core.stage import Backpressure
+
+
+class JoinPort(Sink):
+    """Input pad of a Join element
+
+    Producers are linked to a port of the join instead of the join itself, so
+    the join knows which input every chunk belongs to.
+    """
+
+    def __init__(self, join, port: str):
+        """Creates an input of the given join
+
+        Args:
+            join (Join): Element receiving the data
+            port (str): Name of the input
+        """
+        super().__init__("%s:%s" % (join.name or type(join).__name__, port))
+        self.__join = join
+        self.__port = port
+
+    @property
+    def join(self):
+        """Returns the element receiving the data"""
+        return self.__join
+
+    @property
+    def port(self) -> str:
+        """Returns the name of the input"""
+        return self.__port
+
+    def process(self, data, extra):
+        """Hands a chunk of data to the join
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        self.__join.receive(self.__port, data, extra)
+
+
+class Join(Filter):
+    """Merges several streams into a single one, aligning their chunks by timestamp.
+
+    Every input has its own port (see `input`). The chunks received on each
+    port are queued until every port has one chunk with the same timestamp,
+    within the given tolerance. Those chunks are then propagated together as
+    a tuple ordered as the ports, for instance the microphone and loopback
+    streams of an echo canceller:
+
+        join = Join(ports=("mic", "loopback"))
+        join.link(Transform(lambda data: aec.process(*data)))
+
+    Chunks older than the ones available on the other ports can not be
+    matched anymore and are dropped. When the queue of a port is full, the
+    `backpressure` policy decides if the producer waits for the other ports,
+    as suits file sources, or if a chunk is dropped, as suits live capture.
+    A blocked producer drops its oldest chunk after `timeout` seconds, so a
+    stream that ended does not stall the other ones. The extra information of
+    the output is the one of the first port, with the extra information of
+    every port in the `inputs` entry.
+
+    Chunks without timestamp are matched in order of arrival. The ports may be
+    fed from different threads, the linked elements are run by the thread
+    completing the match.
+    """
+
+    def __init__(self,
+                 ports=("mic", "loopback"),
+                 tolerance: float = None,
+                 capacity: int = 32,
+                 backpressure: Backpressure = Backpressure.BLOCK,
+                 timeout: float = 1.0,
+                 name: str = ""):
+        """Creates a Join element
+
+        Args:
+            ports: Names of the inputs, in the order of the output tuple
+            tolerance (float): Maximum difference in seconds between the timestamps of matching chunks. Defaults
+                to half the duration of a chunk.
+            capacity (int): Maximum number of chunks queued per port
+            backpressure (Backpressure): Policy applied when the queue of a port is full
+            timeout (float): Maximum time in seconds a blocked producer waits for the other ports
+            name (str): Element's name also known as alias
+        """
+        super().__init__(name)
+        ports = tuple(ports)
+        if len(ports) < 2 or len(set(ports)) != len(ports):
+            raise ValueError("A join requires at least two different ports")
+        if capacity < 1:
+            raise ValueError("The capacity must be a positive number")
+        self.__ports = ports
+        self.__inputs = dict((port, JoinPort(self, port)) for port in ports)
+        self.__queues = dict((port, deque()) for port in ports)
+        self.__arrivals = dict((port, 0) for port in ports)
+        self.__tolerance = tolerance
+        self.__capacity = capacity
+        self.__backpressure = Backpressure(backpressure)
+        self.__timeout = timeout
+        self.__dropped = 0
+        self.__condition = threading.Condition(threading.RLock())
+
+    @property
+    def ports(self) -> tuple:
+        """Returns the names of the inputs"""
+        return self.__ports
+
+    @property
+    def dropped(self) -> int:
+        """Returns the number of chunks discarded without a match"""
+        return self.__dropped
+
+    def input(self, port: str) -> JoinPort:
+        """Returns the input pad with the given name
+
+        Args:
+            port (str): Name of the input
+        """
+        if port not in self.__inputs:
+            raise KeyError("Unknown port %s. Expected one of %s" % (port, ", ".join(self.__ports)))
+        return self.__inputs[port]
+
+    def process(self, data, extra) -> tuple:
+        """Returns the matched chunks
+
+        Args:
+            data: Tuple with a chunk of every port
+            extra: Dictionary with any extra information
+        """
+        return data, extra
+
+    def run(self, data, extra=None):
+        """Joins can only receive data through their ports"""
+        raise TypeError("The data of a join must be sent to one of its ports")
+
+    def receive(self, port: str, data, extra):
+        """Queues a chunk of data received on a port and propagates the matching chunks
+
+        Args:
+            port (str): Name of the input
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        with self.__condition:
+            queue = self.__queues[port]
+            if self.__backpressure is Backpressure.BLOCK:
+                self.__condition.wait_for(lambda: len(queue) < self.__capacity, timeout=self.__timeout)
+            elif self.__backpressure is Backpressure.DROP_NEWEST and len(queue) >= self.__capacity:
+                self.__dropped += 1
+                return
+
+            timestamp = extra.get("timestamp") if isinstance(extra, dict) else None
+            if timestamp is None:
+                timestamp = self.__arrivals[port]
+            self.__arrivals[port] += 1
+            queue.append((timestamp, Join.__own(data), extra))
+            while len(queue) > self.__capacity:
+                Join.__release(queue.popleft())
+                self.__dropped += 1
+            self.__match()
+            self.__condition.notify_all()
+
+    def __match(self):
+        """Propagates every set of chunks with the same timestamp on all the ports"""
+        while all(self.__queues.values()):
+            heads = [self.__queues[port][0] for port in self.__ports]
+            latest = max(head[0] for head in heads)
+            tolerance = self.__tolerance_of(heads[0])
+            stale = [port for port, head in zip(self.__ports, heads) if head[0] < latest - tolerance]
+            if stale:
+                for port in stale:
+                    Join.__release(self.__queues[port].popleft())
+                    self.__dropped += 1
+                continue
+
+            chunks = [self.__queues[port].popleft() for port in self.__ports]
+            info = dict(chunks[0][2]) if isinstance(chunks[0][2], dict) else {}
+            info["inputs"] = tuple(chunk[2] for chunk in chunks)
+            try:
+                self.push(*self.process(tuple(chunk[1] for chunk in chunks), info))
+            finally:
+                for chunk in chunks:
+                    Join.__release(chunk)
+
+    def __tolerance_of(self, head: tuple) -> float:
+        """Returns the tolerance applied to the timestamps, using the duration of the given chunk by default"""
+        if self.__tolerance is not None:
+            return self.__tolerance
+        _, data, extra = head
+        if isinstance(extra, dict) and extra.get("rate") and extra.get("timestamp") is not None:
+            return 0.5 * len(data) / float(extra["rate"])
+        return 0.0
+
+    @staticmethod
+    def __own(data):
+        """Copies an array into a buffer borrowed from the pool, as the producer may reuse its memory"""
+        if not isinstance(data, np.ndarray):
+            return data
+        buffer = BufferPool().acquire(data.shape, data.dtype)
+        np.copyto(buffer, data)
+        return buffer
+
+    @staticmethod
+    def __release(chunk: tuple):
+        """Returns the buffer of a queued chunk to the pool"""
+        if isinstance(chunk[1], np.ndarray):
+            BufferPool().release(chunk[1])
@@ -1,5 +1,8 @@
+import time
+
 from smartmeet.core.element import Element
 from smartmeet.core.source import Source
+from smartmeet.core.stage import Backpressure, Stage
 
 
 class Pipeline:
@@ -12,14 +15,50 @@ class Pipeline:
         If parallel processing is enabled, given sufficient processors and tokens, the throughput of the pipeline is
         limited to the throughput of the slowest serial filter.
 
+        In parallel mode every element after the source runs on its own worker thread (see Stage) and consecutive
+        elements communicate through bounded queues. The `backpressure` policy decides what happens when a stage
+        cannot keep up with its producer.
+
     """
 
-    def __init__(self, name: str = "default"):
+    def __init__(self,
+                 name: str = "default",
+                 parallel: bool = False,
+                 queue_size: int = 8,
+                 backpressure: Backpressure = Backpressure.BLOCK):
         """
-
+        Args:
+            name (str): Pipeline's name
+            parallel (bool): Runs each element after the source on its own worker thread
+            queue_size (int): Maximum number of chunks queued between two stages in parallel mode
+            backpressure (Backpressure): Policy applied when a queue between two stages is full
         """
         self.__name = name
         self.__elements = []
+        self.__stages = []
+        self.__parallel = parallel
+        self.__queue_size = queue_size
+        self.__backpressure = Backpressure(backpressure)
+
+    @property
+    def name(self) -> str:
+        """Returns the name of the pipeline"""
+        return self.__name
+
+    @property
+    def parallel(self) -> bool:
+        """Checks if the elements of the pipeline run on their own worker threads"""
+        return self.__parallel
+
+    @property
+    def elements(self) -> tuple:
+        """Returns the elements of the pipeline, starting by the source"""
+        return tuple(self.__elements)
+
+    @property
+    def stages(self) -> tuple:
+        """Returns the stages wrapping the elements in parallel mode"""
+        return tuple(self.__stages)
 
     def add(self, element: Element):
         """ Appends filter f to sequence of filters in the pipeline.
@@ -39,12 +78,18 @@ class Pipeline:
             raise ValueError("The filter already exist in the pipeline")
 
         if self.__elements:
-            self.__elements[-1].link(element)
+            target = element
+            if self.__parallel:
+                target = Stage(sink=element, queue_size=self.__queue_size, backpressure=self.__backpressure)
+                self.__stages.append(target)
+            self.__elements[-1].link(target)
 
         self.__elements.append(element)
 
-    def run(self):
+    def run(self, push: bool = False):
         """ Runs the pipeline until the end of the streaming and processing tasks.
+        Args:
+            push (bool): Lets the source drive the pipeline from its own callback
         Returns:
             A boolean representing if the pipeline has been executed successfully.
         """
@@ -52,20 +97,38 @@ class Pipeline:
         if not self.__elements:
             return False
 
-        return Pipeline.exec(source=self.__elements[0])
+        for stage in self.__stages:
+            stage.start()
+        try:
+            result = Pipeline.exec(source=self.__elements[0], push=push)
+        finally:
+            # Stages are stopped from upstream to downstream, so every stage drains its queue before the next one
+            # receives the stop token.
+            for stage in self.__stages:
+                stage.stop()
+
+        for stage in self.__stages:
+            if stage.error is not None:
+                raise stage.error
+        return result
 
     @staticmethod
-    def exec(source: Source):
+    def exec(source: Source, push: bool = False):
         """ Runs the pipeline until the source elements stop the streaming.
 
         The pipeline will stop when the source elements stop the streaming and each subsequent filter has processed
         all items from its predecessor.
 
+        In push mode the source runs the linked elements from its own callback, without any hand-off to the calling
+        thread, which just waits for the streaming to finish. The processing time of every chunk is checked against
+        its duration by the deadline of the source.
+
         Note:
             A pipeline can be run multiple times. It is safe to add stages between runs.
 
         Args:
             source (Source): Source element which generate the raw data to be processed
+            push (bool): Lets the source drive the pipeline from its own callback
         Returns:
             A boolean representing if the pipeline has been executed successfully.
         """
@@ -73,12 +136,39 @@ class Pipeline:
         if not issubclass(type(source), Source):
             raise TypeError("Only Source objects can start a pipeline")
 
+        if push:
+            return Pipeline.__exec_push(source=source)
+
         source.start()
         while not source.done():
             try:
                 source.run()
-                print("Current timestamp: %s" % source.timestamp())
             except KeyboardInterrupt:
                 source.stop()
                 return False
         return True
+
+    @staticmethod
+    def __exec_push(source: Source, poll_interval: float = 0.1):
+        """ Starts a source in push mode and waits until it stops the streaming.
+
+        Args:
+            source (Source): Source element driving the pipeline from its callback
+            poll_interval (float): Time in seconds between two checks of the streaming state
+        Raises:
+            The exception that aborted the streaming, if any
+        """
+        source.push_mode = True
+        source.deadline.reset()
+        try:
+            source.start()
+            while not source.done():
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            source.stop()
+            return False
+        finally:
+            source.push_mode = False
+        if source.error is not None:
+            raise source.error
+        return True
@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+from singleton_decorator import singleton
+
+
+@singleton
+class BufferPool:
+    """Shared arena of preallocated arrays, keyed by shape and data type.
+
+    Elements producing a new array per chunk borrow it from the pool and
+    return it once it is no longer used, usually when the next chunk is
+    processed. In a steady stream the same arrays are handed out again and
+    again, so the pipeline runs without allocating memory.
+
+    An acquisition served with a returned array is a hit, one requiring a new
+    allocation is a miss. At most `capacity` idle arrays are kept per shape and
+    data type, the extra ones are released to the garbage collector.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.__capacity = capacity
+        self.__free = dict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__discarded = 0
+
+    @property
+    def capacity(self) -> int:
+        """Returns the maximum number of idle arrays kept per shape and data type"""
+        return self.__capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        """Changes the maximum number of idle arrays kept per shape and data type
+
+        Args:
+            capacity (int): Number of arrays
+        """
+        if capacity < 0:
+            raise ValueError("The capacity must be a positive number or zero")
+        self.__capacity = capacity
+
+    @property
+    def hits(self) -> int:
+        """Returns the number of acquisitions served with a returned array"""
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """Returns the number of acquisitions that allocated a new array"""
+        return self.__misses
+
+    @property
+    def idle(self) -> int:
+        """Returns the number of arrays waiting in the pool"""
+        with self.__lock:
+            return sum(len(buffers) for buffers in self.__free.values())
+
+    def acquire(self, shape, dtype=np.float32) -> np.ndarray:
+        """Borrows an array with the given shape and data type
+
+        The content of the array is undefined.
+
+        Args:
+            shape: Shape of the array
+            dtype: Data type of the array
+        """
+        key = (tuple(shape) if hasattr(shape, "__len__") else (int(shape), ), np.dtype(dtype))
+        with self.__lock:
+            buffers = self.__free.get(key)
+            if buffers:
+                self.__hits += 1
+                return buffers.pop()
+            self.__misses += 1
+        return np.empty(shape=key[0], dtype=key[1])
+
+    def release(self, buffer: np.ndarray):
+        """Gives back an array borrowed from the pool
+
+        The caller must not use the array after returning it.
+
+        Args:
+            buffer (np.ndarray): Array returned by `acquire`
+        """
+        if buffer is None:
+            return
+        key = (buffer.shape, buffer.dtype)
+        with self.__lock:
+            buffers = self.__free.setdefault(key, [])
+            if len(buffers) < self.__capacity:
+                buffers.append(buffer)
+            else:
+                self.__discarded += 1
+
+    def recycle(self, buffer: np.ndarray, shape, dtype=np.float32) -> np.ndarray:
+        """Gives back an array and borrows another one with the given shape and data type
+
+        Elements handing out a new array per chunk call this function with
+        the array of the previous chunk.
+
+        Args:
+            buffer (np.ndarray): Array returned by `acquire`, or None
+            shape: Shape of the new array
+            dtype: Data type of the new array
+        """
+        self.release(buffer)
+        return self.acquire(shape, dtype)
+
+    def stats(self) -> dict:
+        """Returns the counters of the pool"""
+        total = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "discarded": self.__discarded,
+            "idle": self.idle,
+            "hit_ratio": self.__hits / float(total) if total else 0.0
+        }
+
+    def clear(self):
+        """Releases the idle arrays and resets the counters"""
+        with self.__lock:
+            self.__free.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__discarded = 0
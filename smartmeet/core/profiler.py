@@ -1,61 +1,306 @@
+import json
+import math
 import operator
-from time import time
+import os
+import threading
+from time import perf_counter
 
 import numpy as np
 from singleton_decorator import singleton
 
 
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of latencies with a fixed memory footprint.
+
+    Values are stored as integer multiples of `lowest` in buckets whose width doubles every power of two, keeping
+    `significant` decimal digits of precision over the whole range. Two histograms with the same configuration can
+    be merged by adding their counters.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 60.0, significant: int = 2):
+        """
+        Args:
+            lowest (float): Smallest distinguishable value, in seconds
+            highest (float): Largest trackable value, in seconds. Bigger values are clamped.
+            significant (int): Number of significant decimal digits kept for every value
+        """
+        if lowest <= 0 or highest <= lowest:
+            raise ValueError("Invalid range. Expected 0 < lowest < highest")
+        if not 1 <= significant <= 5:
+            raise ValueError("The number of significant digits must be in the range [1, 5]")
+
+        self.__lowest = lowest
+        self.__highest = highest
+        self.__significant = significant
+        self.__sub_bucket_bits = int(math.ceil(math.log2(2 * 10**significant)))
+        self.__half_count = 1 << (self.__sub_bucket_bits - 1)
+        self.__max_units = int(highest / lowest)
+        self.__counts = np.zeros(shape=[self.__index(self.__max_units) + 1], dtype=np.int64)
+
+    @property
+    def layout(self) -> tuple:
+        """Returns the configuration used to build the histogram"""
+        return self.__lowest, self.__highest, self.__significant
+
+    @property
+    def count(self) -> int:
+        """Returns the number of recorded values"""
+        return int(self.__counts.sum())
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Returns the counters of every bucket"""
+        return self.__counts
+
+    def __index(self, units: int) -> int:
+        bucket = max(0, units.bit_length() - self.__sub_bucket_bits)
+        return bucket * self.__half_count + (units >> bucket)
+
+    def __value(self, index: int) -> float:
+        bucket = max(0, index // self.__half_count - 1)
+        sub_bucket = index - bucket * self.__half_count
+        # Middle point of the bucket, expressed in seconds
+        return ((sub_bucket << bucket) + ((1 << bucket) - 1) / 2.0) * self.__lowest
+
+    def record(self, value: float, count: int = 1):
+        """Adds a value to the histogram
+
+        Args:
+            value (float): Value in seconds
+            count (int): Number of occurrences of the value
+        """
+        units = min(max(int(value / self.__lowest), 0), self.__max_units)
+        self.__counts[self.__index(units)] += count
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Adds the counters of another histogram with the same layout
+
+        Args:
+            other (LatencyHistogram): Histogram to merge
+        """
+        if other.layout != self.layout:
+            raise ValueError("Only histograms with the same layout can be merged")
+        self.__counts += other.counts
+
+    def percentile(self, q: float) -> float:
+        """Returns the value below which `q` percent of the recorded values fall
+
+        Args:
+            q (float): Percentile in the range [0, 100]
+        """
+        cumulative = np.cumsum(self.__counts)
+        if not cumulative[-1]:
+            return 0.0
+        rank = max(1, int(math.ceil(q / 100.0 * cumulative[-1])))
+        return self.__value(int(np.searchsorted(cumulative, rank)))
+
+    def reset(self):
+        """Clears every counter"""
+        self.__counts.fill(0)
+
+
 class ProfilerReport:
+    """Streaming statistics of a profiled label.
+
+    The mean and the variance are updated online (Welford's algorithm) and the distribution is tracked by a
+    LatencyHistogram, so the memory used by a report does not grow with the number of measures.
+    """
+
     def __init__(self, label: str):
-        self.__measures = np.zeros(
-            shape=[
-                1,
-            ], dtype=np.float64)
         self.__label = label
+        self.__lock = threading.Lock()
+        self.__histogram = LatencyHistogram()
+        self.__count = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        self.__total = 0.0
+        self.__worst = 0.0
+        self.__best = math.inf
 
     @property
     def label(self):
         return self.__label
 
+    @property
+    def count(self):
+        return self.__count
+
     @property
     def average(self):
-        return np.mean(self.__measures)
+        return self.__mean
+
+    @property
+    def variance(self):
+        return self.__m2 / (self.__count - 1) if self.__count > 1 else 0.0
+
+    @property
+    def deviation(self):
+        return math.sqrt(self.variance)
 
     @property
     def worst(self):
-        return np.max(self.__measures)
+        return self.__worst
 
     @property
     def best(self):
-        return np.min(self.__measures)
+        return self.__best if self.__count else 0.0
 
     @property
     def total(self):
-        return np.sum(self.__measures)
+        return self.__total
+
+    @property
+    def histogram(self) -> LatencyHistogram:
+        return self.__histogram
+
+    def percentile(self, q: float) -> float:
+        """Returns an estimation of the given percentile
+
+        Args:
+            q (float): Percentile in the range [0, 100]
+        """
+        return self.__histogram.percentile(q)
+
+    def record(self, elapsed: float):
+        """Adds a new measure
+
+        Args:
+            elapsed (float): Measured time in seconds
+        """
+        with self.__lock:
+            self.__count += 1
+            delta = elapsed - self.__mean
+            self.__mean += delta / self.__count
+            self.__m2 += delta * (elapsed - self.__mean)
+            self.__total += elapsed
+            self.__worst = max(self.__worst, elapsed)
+            self.__best = min(self.__best, elapsed)
+            self.__histogram.record(elapsed)
 
     def profile(self, func, *args, **kw):
-        t0 = time()
+        t0 = perf_counter()
         result = func(*args, **kw)
-        np.append(self.__measures, time() - t0)
+        self.record(perf_counter() - t0)
         return result
 
+    def snapshot(self) -> dict:
+        """Returns the current statistics as a dictionary"""
+        return {
+            "label": self.__label,
+            "count": self.__count,
+            "total": self.__total,
+            "average": self.__mean,
+            "deviation": self.deviation,
+            "best": self.best,
+            "worst": self.__worst,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
 
 @singleton
 class Profiler:
     def __init__(self):
         self.__entries = dict()
+        self.__counters = dict()
+        self.__lock = threading.Lock()
 
     def __get_profiler(self, label: str) -> ProfilerReport:
         if label not in self.__entries:
-            profiler = ProfilerReport(label=label)
-            self.__entries[label] = profiler
+            with self.__lock:
+                self.__entries.setdefault(label, ProfilerReport(label=label))
         return self.__entries[label]
 
+    def report(self, label: str) -> ProfilerReport:
+        """Returns the report of the given label
+
+        Args:
+            label (str): Name of the measure
+        """
+        return self.__get_profiler(label=label)
+
     def profile(self, label, func, *args, **kw):
-        self.__get_profiler(label=label).profile(func=func, args=args, kw=kw)
+        return self.__get_profiler(label=label).profile(func, *args, **kw)
+
+    def record(self, label: str, elapsed: float):
+        """Adds a measure taken by the caller
+
+        Args:
+            label (str): Name of the measure
+            elapsed (float): Measured time in seconds
+        """
+        self.__get_profiler(label=label).record(elapsed)
+
+    def count(self, label: str, value: int = 1):
+        """Increases a monotonic counter, for instance the number of dropped frames
+
+        Args:
+            label (str): Name of the counter
+            value (int): Increment
+        """
+        with self.__lock:
+            self.__counters[label] = self.__counters.get(label, 0) + value
+
+    def reset(self):
+        """Discards every measure and counter"""
+        with self.__lock:
+            self.__entries = dict()
+            self.__counters = dict()
+
+    def snapshot(self) -> dict:
+        """Returns the statistics of every label and the value of every counter"""
+        reports = sorted(self.__entries.values(), key=operator.attrgetter("label"))
+        return {
+            "measures": [report.snapshot() for report in reports],
+            "counters": dict(self.__counters),
+        }
+
+    def to_json(self, file_name: str):
+        """Writes a snapshot into a JSON file
+
+        Args:
+            file_name (str): Output file name
+        """
+        self.__write(file_name, json.dumps(self.snapshot(), indent=2))
+
+    def to_prometheus(self, file_name: str, prefix: str = "smartmeet"):
+        """Writes a snapshot using the Prometheus text exposition format
+
+        The file is replaced atomically, so it can be scraped by the textfile collector of the node exporter while
+        the pipeline is running.
+
+        Args:
+            file_name (str): Output file name
+            prefix (str): Prefix of the metric names
+        """
+        snapshot = self.snapshot()
+        lines = ["# TYPE %s_latency_seconds summary" % prefix]
+        for entry in snapshot["measures"]:
+            label = self.__escape(entry["label"])
+            for quantile in ("p50", "p95", "p99"):
+                lines.append('%s_latency_seconds{label="%s",quantile="0.%s"} %.9g' %
+                             (prefix, label, quantile[1:], entry[quantile]))
+            lines.append('%s_latency_seconds_sum{label="%s"} %.9g' % (prefix, label, entry["total"]))
+            lines.append('%s_latency_seconds_count{label="%s"} %d' % (prefix, label, entry["count"]))
+        lines.append("# TYPE %s_events_total counter" % prefix)
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append('%s_events_total{label="%s"} %d' % (prefix, self.__escape(name), value))
+        self.__write(file_name, "\n".join(lines) + "\n")
+
+    @staticmethod
+    def __escape(label: str) -> str:
+        return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @staticmethod
+    def __write(file_name: str, content: str):
+        temporary = file_name + ".tmp"
+        with open(temporary, "w") as output:
+            output.write(content)
+        os.replace(temporary, file_name)
 
     def print(self):
-        for profiler in sorted(self.__entries.items(), key=operator.itemgetter(1)):
+        for profiler in sorted(self.__entries.values(), key=operator.attrgetter("label")):
             print(
                 "Label: %s \t Total: %f \t Average: %f \t Worst: %f \t Best: %f " %
                 (profiler.label, profiler.total, profiler.average, profiler.worst, profiler.best))
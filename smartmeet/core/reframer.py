@@ -0,0 +1,153 @@
+from time import perf_counter
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from smartmeet.core.filter import Filter
+from smartmeet.core.instrumentation import Instrumentation
+
+
+class Reframer(Filter):
+    """Turns chunks of arbitrary size into frames of a fixed size.
+
+    Modules like NoiseSuppressor, VAD or AEC only accept frames of a given
+    duration, while sources deliver chunks of whatever size they were set up
+    with. A Reframer accumulates the incoming samples and propagates every
+    complete frame of `frame_size` samples, starting a new frame every `hop`
+    samples. A hop smaller than the frame size produces overlapping frames.
+
+    The samples are appended to a linear buffer and the frames are strided
+    views over it, so they are not copied. The buffer is compacted when the
+    next chunk arrives, moving the samples of the incomplete frame to its
+    beginning, so a frame is only valid until the next chunk is processed.
+
+    The `timestamp` of the extra information is adjusted to the first sample
+    of every frame using the `rate`, and `frames` is set to the frame size.
+    When the incoming extra information has a `valid_frames` entry, only
+    those frames of the chunk are buffered, dropping the padding of the last
+    chunk of a file. The output frames hold no padding, so they do not have
+    that entry.
+    """
+
+    def __init__(self, frame_size: int, hop: int = None, name: str = ""):
+        """Creates a Reframer element
+
+        Args:
+            frame_size (int): Number of frames per channel of the output frames
+            hop (int): Number of frames between the start of two consecutive
+                output frames. Defaults to the frame size.
+            name (str): Element's name also known as alias
+        """
+        super().__init__(name)
+        if hop is None:
+            hop = frame_size
+        if frame_size < 1 or not 0 < hop <= frame_size:
+            raise ValueError("The hop must be in the range (0, frame_size]")
+        self.__frame_size = frame_size
+        self.__hop = hop
+        self.reset()
+
+    @property
+    def frame_size(self) -> int:
+        """Returns the number of frames per channel of the output frames"""
+        return self.__frame_size
+
+    @property
+    def hop(self) -> int:
+        """Returns the number of frames between two consecutive output frames"""
+        return self.__hop
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of buffered frames not yet emitted"""
+        return self.__end - self.__start
+
+    def reset(self):
+        """Discards the buffered samples"""
+        self.__buffer = None
+        self.__start = 0
+        self.__end = 0
+        self.__timestamp = None
+
+    def process(self, data, extra) -> tuple:
+        """Appends a chunk of data and returns the complete frames
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+
+        Returns:
+            A read-only array of views with shape [count, frame_size, ...] and
+            the extra information of the first frame
+        """
+        data = np.asarray(data)
+        self.__append(data, extra)
+
+        available = self.__end - self.__start
+        count = (available - self.__frame_size) // self.__hop + 1 if available >= self.__frame_size else 0
+        samples = self.__buffer[self.__start:]
+        if data.ndim == 1:
+            samples = samples[:, 0]
+        frames = as_strided(samples,
+                            shape=(count, self.__frame_size) + samples.shape[1:],
+                            strides=(self.__hop * samples.strides[0], ) + samples.strides,
+                            writeable=False)
+
+        info = dict(extra) if isinstance(extra, dict) else {}
+        info["frames"] = self.__frame_size
+        info.pop("valid_frames", None)
+        if self.__timestamp is not None:
+            info["timestamp"] = self.__timestamp
+        self.__start += count * self.__hop
+        return frames, info
+
+    def run(self, data, extra=None):
+        """Appends a chunk of data and propagates every complete frame
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        if Instrumentation.enabled:
+            start = perf_counter()
+            frames, info = self.process(data, extra)
+            Instrumentation.record(self.name or type(self).__name__, perf_counter() - start, data, extra)
+        else:
+            frames, info = self.process(data, extra)
+
+        timestamp = info.get("timestamp") if "rate" in info else None
+        for index, frame in enumerate(frames):
+            frame_info = dict(info)
+            if timestamp is not None:
+                frame_info["timestamp"] = timestamp + index * self.__hop / float(info["rate"])
+            self.push(frame, frame_info)
+
+    def __append(self, data, extra):
+        """Compacts the buffer and copies the chunk after the pending samples
+
+        Args:
+            data: Input data, [frames] or [frames, channels]
+            extra: Dictionary with any extra information
+        """
+        samples = data.reshape(len(data), -1)
+        if isinstance(extra, dict) and extra.get("valid_frames") is not None:
+            samples = samples[:extra["valid_frames"]]
+        pending = self.__end - self.__start
+        if self.__buffer is None or self.__buffer.shape[1] != samples.shape[1] or self.__buffer.dtype != samples.dtype:
+            self.__buffer = np.empty(shape=[2 * self.__frame_size + len(samples), samples.shape[1]], dtype=samples.dtype)
+            pending = 0
+        elif pending + len(samples) > len(self.__buffer):
+            buffer = np.empty(shape=[pending + len(samples) + self.__frame_size, samples.shape[1]], dtype=samples.dtype)
+            buffer[:pending] = self.__buffer[self.__start:self.__end]
+            self.__buffer = buffer
+        elif self.__start:
+            self.__buffer[:pending] = self.__buffer[self.__start:self.__end]
+
+        self.__buffer[pending:pending + len(samples)] = samples
+        self.__start = 0
+        self.__end = pending + len(samples)
+
+        if isinstance(extra, dict) and extra.get("rate") and extra.get("timestamp") is not None:
+            self.__timestamp = extra["timestamp"] - pending / float(extra["rate"])
+        else:
+            self.__timestamp = None
@@ -1,8 +1,9 @@
 from abc import abstractmethod
-
-from profilehooks import profile
+from time import perf_counter
 
 from smartmeet.core.element import Element
+from smartmeet.core.fanout import FanOut
+from smartmeet.core.instrumentation import Instrumentation
 
 
 class Sink(Element):
@@ -19,14 +20,29 @@ class Sink(Element):
         super().__init__(name)
         self.__sinks = []
 
-    @profile
     def __run_processing(self, data, extra):
-        """
+        """Measures the execution of the main processing callback
+
         Args:
             data:
             extra:
         """
-        return self.process(data=data, extra=extra)
+        start = perf_counter()
+        result = self.process(data=data, extra=extra)
+        Instrumentation.record(self.name or type(self).__name__, perf_counter() - start, data, extra)
+        return result
+
+    @staticmethod
+    def writable(data):
+        """Returns the data if it can be modified in place, a copy otherwise
+
+        The data fanned out to several sinks is read-only, elements modifying
+        their input in place must request a writable array first.
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+        """
+        return FanOut.writable(data)
 
     @abstractmethod
     def process(self, data, extra):
@@ -44,4 +60,7 @@ class Sink(Element):
             data: Input data, generally a numpy array storing audio samples
             extra: Dictionary with any extra information
         """
-        self.__run_processing(data=data, extra=extra)
+        if Instrumentation.enabled:
+            self.__run_processing(data=data, extra=extra)
+        else:
+            self.process(data=data, extra=extra)
@@ -1,8 +1,10 @@
 from abc import abstractmethod
+from time import perf_counter
 
-from profilehooks import profile
-
+from smartmeet.core.deadline import Deadline
 from smartmeet.core.element import Element
+from smartmeet.core.fanout import FanOut
+from smartmeet.core.instrumentation import Instrumentation
 from smartmeet.core.sink import Sink
 
 
@@ -11,6 +13,10 @@ class Source(Element):
     pipeline, for example reading from disk or from a sound card. Those
     components do not have a sink pad, so source elements do not accept data,
     they only generate data.
+
+    Sources driven by a callback, like a sound card, may also support a push
+    mode. In that mode the callback runs the linked elements directly through
+    `push`, instead of handing the data to the pipeline thread.
     """
 
     def __init__(self, name: str = ""):
@@ -20,6 +26,57 @@ class Source(Element):
         """
         super().__init__(name)
         self.__sinks = []
+        self.__executor = None
+        self.__push_mode = False
+        self.__deadline = Deadline(label=name if name else type(self).__name__)
+
+    @property
+    def supports_push(self) -> bool:
+        """Checks if the source can drive the pipeline from its own callback"""
+        return False
+
+    @property
+    def push_mode(self) -> bool:
+        """Checks if the source pushes the data to the linked elements"""
+        return self.__push_mode
+
+    @push_mode.setter
+    def push_mode(self, enabled: bool):
+        """Enables or disables the push mode
+
+        Args:
+            enabled (bool): True to push the data from the source callback
+        """
+        if enabled and not self.supports_push:
+            raise TypeError("%s does not support push mode" % type(self).__name__)
+        self.__push_mode = enabled
+
+    @property
+    def error(self):
+        """Returns the exception that aborted the streaming in push mode, if any"""
+        return None
+
+    @property
+    def deadline(self) -> Deadline:
+        """Returns the deadline checker of the data pushed by the source"""
+        return self.__deadline
+
+    @property
+    def executor(self):
+        """Returns the executor running the linked sinks in parallel, if any"""
+        return self.__executor
+
+    @executor.setter
+    def executor(self, executor):
+        """Runs the linked sinks in parallel on the given executor
+
+        The sinks receive a read-only view of the data, and the element waits
+        until all of them have processed it.
+
+        Args:
+            executor: A concurrent.futures.Executor, or None to run the sinks in order
+        """
+        self.__executor = executor
 
     @abstractmethod
     def process(self):
@@ -41,7 +98,11 @@ class Source(Element):
 
     @abstractmethod
     def stop(self):
-        """Stops the streaming"""
+        """Stops the streaming
+
+        The streaming may be stopped from another thread while `process` is running, for instance when another
+        source of a Graph fails, so this function must not block waiting for it.
+        """
 
     @abstractmethod
     def timestamp(self):
@@ -78,21 +139,48 @@ class Source(Element):
         sinks.
 
         The function generate a chunk of data and propagates the results to
-        all the different sinks that conform the pipeline.
+        all the different sinks that conform the pipeline. Nothing is
+        propagated when the source returns None, as a stopped source does.
         """
-        data, extra = self.__run_processing()
+        if Instrumentation.enabled:
+            data, extra = self.__run_processing()
+        else:
+            data, extra = self.process()
+        if data is not None:
+            self.__propagate(data=data, extra=extra)
+
+    def push(self, data, extra=None):
+        """Sends a chunk of data generated outside of `process` to the
+        different connected sinks.
+
+        The processing time of the linked elements is checked against the
+        duration of the chunk, computed from the `rate` entry of the extra
+        information.
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        start = perf_counter()
         self.__propagate(data=data, extra=extra)
+        if isinstance(extra, dict) and extra.get("rate"):
+            self.__deadline.check(perf_counter() - start, len(data) / float(extra["rate"]))
 
-    @profile
     def __run_processing(self):
-        """Profiles the execution of the main processing callback"""
-        return self.process()
+        """Measures the execution of the main processing callback"""
+        start = perf_counter()
+        data, extra = self.process()
+        Instrumentation.record(self.name or type(self).__name__, perf_counter() - start, data, extra)
+        return data, extra
 
     def __propagate(self, data, extra):
-        """
+        """Runs the linked sinks with the data
+
+        A single sink owns the data, several sinks share a read-only view of
+        it.
+
         Args:
             data:
             extra:
         """
-        for sink in self.__sinks:
-            sink.run(data, extra)
+        FanOut.propagate(self.__sinks, data, extra, self.__executor)
@@ -0,0 +1,174 @@
+import queue
+import threading
+from enum import Enum
+
+import numpy as np
+
+from smartmeet.core.pool import BufferPool
+from smartmeet.core.sink import Sink
+
+
+class Backpressure(Enum):
+    """Policy applied when a bounded queue between two stages is full
+
+    * BLOCK: The producer waits until the consumer frees a slot.
+    * DROP_OLDEST: The oldest queued item is discarded to make room for the new one.
+    * DROP_NEWEST: The incoming item is discarded and the queue is left untouched.
+    """
+    BLOCK = "block"
+    DROP_OLDEST = "drop-oldest"
+    DROP_NEWEST = "drop-newest"
+
+
+class Stage(Sink):
+    """A Stage runs a Sink (or Filter) element on its own worker thread.
+
+    The producer hands every chunk of data to a bounded queue and returns immediately, while the worker thread pops
+    the chunks in order and runs the wrapped element. Chaining stages decouples the execution of the elements, so a
+    slow element does not stall the producers placed before it.
+
+    The producer may reuse the memory of a chunk as soon as it has been handed over, so arrays are copied into
+    buffers borrowed from the BufferPool, which are given back once the wrapped element has processed them. The
+    arrays of a tuple, like the aligned chunks propagated by a Join, are copied one by one.
+    """
+
+    __STOP = object()
+
+    def __init__(self, sink: Sink, queue_size: int = 8, backpressure: Backpressure = Backpressure.BLOCK, name: str = ""):
+        """Creates a Stage wrapping the given element
+
+        Args:
+            sink (Sink): Element to be executed in the worker thread
+            queue_size (int): Maximum number of chunks waiting to be processed
+            backpressure (Backpressure): Policy applied when the queue is full
+            name (str): Element's name also known as alias
+        """
+        if not issubclass(type(sink), Sink):
+            raise TypeError("Only Sink objects can be executed in a Stage")
+        if queue_size < 1:
+            raise ValueError("The queue size must be a positive number")
+
+        super().__init__(name if name else sink.name)
+        self.__sink = sink
+        self.__backpressure = Backpressure(backpressure)
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__thread = None
+        self.__error = None
+        self.__dropped = 0
+
+    @property
+    def sink(self) -> Sink:
+        """Returns the element executed by the stage"""
+        return self.__sink
+
+    @property
+    def backpressure(self) -> Backpressure:
+        """Returns the policy applied when the queue is full"""
+        return self.__backpressure
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of chunks waiting to be processed"""
+        return self.__queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        """Returns the number of chunks discarded by the backpressure policy"""
+        return self.__dropped
+
+    @property
+    def error(self):
+        """Returns the exception raised by the wrapped element, if any"""
+        return self.__error
+
+    def start(self):
+        """Starts the worker thread"""
+        if self.__thread is not None:
+            raise RuntimeError("The stage is already running")
+        self.__error = None
+        self.__dropped = 0
+        self.__thread = threading.Thread(target=self.__loop, name="smartmeet-stage-%s" % self.name, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stops the worker thread once every queued chunk has been processed"""
+        if self.__thread is None:
+            return
+        self.__queue.put(Stage.__STOP)
+        self.__thread.join()
+        self.__thread = None
+
+    def run(self, data, extra=None):
+        """Queues a chunk of data to be processed by the worker thread
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        self.process(data=data, extra=extra)
+
+    def process(self, data, extra):
+        """Queues a chunk of data applying the backpressure policy
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        if self.__error is not None:
+            raise self.__error
+
+        item = (Stage.__own(data), extra)
+        if self.__backpressure is Backpressure.BLOCK:
+            self.__queue.put(item)
+            return
+
+        while True:
+            try:
+                self.__queue.put_nowait(item)
+                return
+            except queue.Full:
+                if self.__backpressure is Backpressure.DROP_NEWEST:
+                    Stage.__release(item)
+                    self.__dropped += 1
+                    return
+            try:
+                Stage.__release(self.__queue.get_nowait())
+                self.__dropped += 1
+            except queue.Empty:
+                pass
+
+    def __loop(self):
+        """Processes the queued chunks until the stop token is received"""
+        while True:
+            item = self.__queue.get()
+            if item is Stage.__STOP:
+                return
+            if self.__error is not None:
+                Stage.__release(item)
+                continue
+            try:
+                self.__sink.run(*item)
+            except Exception as error:
+                self.__error = error
+            Stage.__release(item)
+
+    @staticmethod
+    def __own(data):
+        """Copies an array, or every array of a tuple like the output of a Join, into buffers borrowed from the pool"""
+        if isinstance(data, tuple):
+            return tuple(Stage.__own(value) for value in data)
+        if not isinstance(data, np.ndarray):
+            return data
+        buffer = BufferPool().acquire(data.shape, data.dtype)
+        np.copyto(buffer, data)
+        return buffer
+
+    @staticmethod
+    def __release(item):
+        """Returns the buffers of a queued chunk to the pool"""
+        if not isinstance(item, tuple):
+            return
+        data = item[0]
+        for value in data if isinstance(data, tuple) else (data, ):
+            if isinstance(value, np.ndarray):
+                BufferPool().release(value)
@@ -0,0 +1,55 @@
+from smartmeet.core.filter import Filter
+
+
+class Transform(Filter):
+    """Adapts a processing object to a Filter element.
+
+    The processing blocks of the framework (DCRemoval, NoiseSuppressor,
+    Resample...) expose a `process(data)` method returning the processed
+    data. A Transform runs one of those objects, or any callable with the same
+    signature, as part of a pipeline. The extra information is forwarded
+    untouched, unless the processor changes the number of frames of the
+    chunk, like Resample does. Then `frames` is set to the new length and
+    `valid_frames` is dropped, as the padding of the input can no longer be
+    located in the output.
+    """
+
+    def __init__(self, processor, name: str = ""):
+        """Creates a Transform element
+
+        Args:
+            processor: Object with a `process(data)` method, or a callable
+            name (str): Element's name also known as alias
+        """
+        func = getattr(processor, "process", processor)
+        if not callable(func):
+            raise TypeError("The processor must be callable or provide a process method")
+        super().__init__(name if name else type(processor).__name__)
+        self.__processor = processor
+        self.__func = func
+
+    @property
+    def processor(self):
+        """Returns the wrapped processing object"""
+        return self.__processor
+
+    def process(self, data, extra) -> tuple:
+        """Process a chunk of data
+
+        Args:
+            data: Input data, generally a numpy array storing audio samples
+            extra: Dictionary with any extra information
+        """
+        result = self.__func(data)
+        if isinstance(extra, dict) and Transform.__resized(data, result):
+            extra = dict(extra)
+            if "frames" in extra:
+                extra["frames"] = len(result)
+            extra.pop("valid_frames", None)
+        return result, extra
+
+    @staticmethod
+    def __resized(data, result) -> bool:
+        """Checks if the processor changed the number of frames of an array"""
+        return (hasattr(data, "shape") and hasattr(result, "shape") and len(data.shape) > 0 and len(result.shape) > 0
+                and data.shape[0] != result.shape[0])
@@ -1,11 +1,25 @@
 from scipy import signal
-from profilehooks import profile
 from numpy import ndarray
 
 class DCRemoval():
+    """This class removes the DC offset of a signal with a high-pass Butterworth filter.
 
-    def __init__(self, rate: int, order: int = 5):
+    The filter is applied as a stream: the state of every channel is kept between calls, so processing a signal in
+    chunks gives the same result as processing it at once. All the channels of a chunk are filtered in a single call
+    along the frame `axis`.
+    """
+
+    def __init__(self, rate: int, order: int = 5, axis: int = 0):
+        """Creates a DCRemoval element
+
+        Args:
+            rate (int): The audio sample rate, in Hz.
+            order (int): Order of the Butterworth filter
+            axis (int): Axis of the frames in the input data, 0 for the [frames, channels] layout
+        """
         self.__cutoff = 10.0
+        self.__axis = axis
+        self.__zi = None
         self.__sos = signal.butter(N=order,
                                    Wn=2.0 * self.__cutoff / float(rate),
                                    analog=False,
@@ -17,20 +31,51 @@ class DCRemoval():
         """ Returns the cut off frequency of the High-Pass filter """
         return self.__cutoff
 
+    @property
+    def axis(self) -> int:
+        """ Returns the axis of the frames in the input data """
+        return self.__axis
+
     def freqz(self):
         """ Returns the frequency response of the filter"""
         return signal.sosfreqz(self.__sos, worN=2000)
 
+    def reset(self):
+        """Discards the filter state, for instance when the stream is restarted"""
+        self.__zi = None
 
-    @profile
     def process(self, data : ndarray) -> ndarray:
-        """Removes the mean value or linear trend from a N-dimensional array.
+        """Removes the DC offset of a chunk of a stream.
+
+        The filter state is initialised from the first chunk as if the signal
+        had been constant before it, so the stream does not start with a
+        transient.
 
         Args:
             data (ndarray): An array containing the data
 
         Returns:
-            An array the same size as input containing the median filtered
-            result.
+            An array the same size as input containing the filtered result,
+            with the data type of the input for floating point data.
+        """
+        axis = self.__axis % data.ndim
+        shape = (self.__sos.shape[0], ) + data.shape[:axis] + (2, ) + data.shape[axis + 1:]
+        if self.__zi is None or self.__zi.shape != shape:
+            self.__zi = self.__initial_state(data, axis)
+        result, self.__zi = signal.sosfilt(self.__sos, data, axis=axis, zi=self.__zi)
+        if data.dtype.kind == 'f':
+            # The filter runs in double precision, the output keeps the precision of the input
+            return result.astype(data.dtype, copy=False)
+        return result
+
+    def __initial_state(self, data: ndarray, axis: int) -> ndarray:
+        """Computes the steady state of the filter for the first sample of every channel
+
+        Returns:
+            An array of shape [sections, *channels] with 2 values along the
+            frame axis, as expected by sosfilt
         """
-        return signal.sosfilt(self.__sos, data)
+        shape = [1] * data.ndim
+        shape[axis] = 2
+        zi = signal.sosfilt_zi(self.__sos).reshape([self.__sos.shape[0]] + shape)
+        return zi * data.take([0], axis=axis)[None]
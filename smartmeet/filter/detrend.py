@@ -1,6 +1,7 @@
-from scipy import signal
+from functools import lru_cache
+
+import numpy as np
 from numpy import ndarray
-from profilehooks import profile
 
 class Detrend:
     """This class removes the mean value or linear trend from a N-dimensional
@@ -9,9 +10,19 @@ class Detrend:
     The algorithm computes the least-squares fit of a straight line (or
     composite line for piecewise linear trends) to the data and subtracts the
     resulting function from the data.
+
+    The least-squares solution only depends on the frame length and the
+    break points, so the design matrix and its pseudo-inverse are computed
+    once per configuration and cached. Detrending a frame is then two small
+    matrix products shared by all the channels.
+
+    In streaming mode the trend is estimated over the whole stream, with an
+    exponential forgetting factor that weights the past samples less and
+    less. The weighted sums of the fit are updated recursively, so the cost
+    per frame is a fixed [2, frames] x [frames, channels] product.
     """
 
-    def __init__(self, type: str = "linear"):
+    def __init__(self, type: str = "linear", bp=(), axis: int = 0, streaming: bool = False, forgetting: float = 0.999):
         """Create a Detrend element.
 
         If ``ftype == 'linear'`` (default), the result of a linear
@@ -19,11 +30,73 @@ class Detrend:
         ``ftype == 'constant'``, only the mean of `data` is subtracted.
 
         Args:
-            type (str):
+            type (str): Type of detrending, 'linear' or 'constant'
+            bp: Sequence of break points. An individual linear fit is
+                performed for each part of the frame between two break points.
+                Ignored in streaming mode.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
+            streaming (bool): Estimates the trend over the whole stream
+                instead of every frame independently
+            forgetting (float): Weight of a sample relative to the next one in
+                streaming mode, in the range (0, 1]
         """
+        if type not in ("linear", "constant"):
+            raise ValueError("Trend type must be 'linear' or 'constant'.")
+        if not 0 < forgetting <= 1:
+            raise ValueError("The forgetting factor must be in the range (0, 1]")
         self.type = type
+        self.bp = tuple(sorted(set(int(b) for b in bp)))
+        self.axis = axis
+        self.streaming = streaming
+        self.forgetting = forgetting
+        self.reset()
+
+    def reset(self):
+        """Discards the trend estimated in streaming mode"""
+        self.__moments = None
+        self.__sums = None
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def __projection(frames: int, type: str, bp: tuple) -> tuple:
+        """Returns the design matrix of the trend and its pseudo-inverse
+
+        Args:
+            frames (int): Number of frames
+            type (str): Type of detrending
+            bp (tuple): Break points
+        """
+        if type == "constant":
+            design = np.ones(shape=[frames, 1], dtype=np.float64)
+        else:
+            edges = [0] + [b for b in bp if 0 < b < frames] + [frames]
+            design = np.zeros(shape=[frames, 2 * (len(edges) - 1)], dtype=np.float64)
+            for segment, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+                design[start:end, 2 * segment] = np.arange(1, end - start + 1) / float(frames)
+                design[start:end, 2 * segment + 1] = 1.0
+        inverse = np.linalg.pinv(design)
+        design.flags.writeable = False
+        inverse.flags.writeable = False
+        return design, inverse
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def __weights(frames: int, forgetting: float) -> tuple:
+        """Returns the weighting matrix of a frame in streaming mode and its weighted moments
+
+        Args:
+            frames (int): Number of frames
+            forgetting (float): Forgetting factor
+        """
+        index = np.arange(frames, dtype=np.float64)
+        weights = forgetting**(frames - 1 - index)
+        matrix = np.vstack((weights, weights * index))
+        moments = np.array([weights.sum(), (weights * index).sum(), (weights * index * index).sum()])
+        for array in (index, matrix, moments):
+            array.flags.writeable = False
+        return index, matrix, moments
 
-    @profile
     def process(self, data : ndarray) -> ndarray:
         """Removes the mean value or linear trend from a N-dimensional array.
 
@@ -31,7 +104,52 @@ class Detrend:
             data (ndarray): An array containing the data
 
         Returns:
-            An array the same size as input containing the median filtered
-            result.
+            An array the same size as input containing the detrended result.
+        """
+        frames = np.moveaxis(data, self.axis, 0)
+        shape = frames.shape
+        frames = frames.reshape(shape[0], -1)
+        if not len(frames):
+            return data
+
+        if self.streaming:
+            result = self.__process_stream(frames)
+        else:
+            design, inverse = Detrend.__projection(len(frames), self.type, self.bp)
+            result = frames - np.dot(design, np.dot(inverse, frames))
+
+        if np.issubdtype(data.dtype, np.floating):
+            result = result.astype(data.dtype, copy=False)
+        return np.moveaxis(result.reshape(shape), 0, self.axis)
+
+    def __process_stream(self, frames: ndarray) -> ndarray:
+        """Updates the exponentially weighted fit with a new frame and removes the current trend
+
+        The weighted sums are expressed with the time origin at the first
+        sample of the current frame, and shifted by the frame length once it
+        has been processed.
         """
-        return signal.detrend(data=data, type=self.type)
+        count = len(frames)
+        index, matrix, moments = Detrend.__weights(count, self.forgetting)
+        if self.__sums is None or self.__sums.shape[1] != frames.shape[1]:
+            self.__moments = np.zeros(shape=[3], dtype=np.float64)
+            self.__sums = np.zeros(shape=[2, frames.shape[1]], dtype=np.float64)
+
+        self.__moments += moments
+        self.__sums += np.dot(matrix, frames)
+        s0, s1, s2 = self.__moments
+        sy, sty = self.__sums
+
+        determinant = s0 * s2 - s1 * s1
+        if self.type == "constant" or determinant <= 1e-12 * s0 * s2:
+            offset, slope = sy / s0, np.zeros_like(sy)
+        else:
+            offset = (s2 * sy - s1 * sty) / determinant
+            slope = (s0 * sty - s1 * sy) / determinant
+        result = frames - offset - np.outer(index, slope)
+
+        decay = self.forgetting**count
+        self.__moments[:] = decay * s0, decay * (s1 - count * s0), decay * (s2 - 2 * count * s1 + count * count * s0)
+        self.__sums[1] = decay * (sty - count * sy)
+        self.__sums[0] = decay * sy
+        return result
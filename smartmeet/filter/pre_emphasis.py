@@ -1,32 +1,105 @@
-from speechpy.processing import preemphasis
+import numpy as np
+from scipy import signal
 from numpy import ndarray
-from profilehooks import profile
 
 class PreEmphasis:
-    """This class perform a pre-emphasis filter on an N-dimensional array."""
+    """This class perform a pre-emphasis filter on an N-dimensional array.
 
-    def __init__(self, cof: float = 0.95):
-        """Create a MedianFilter element.
+    The filter computes ``y[n] = x[n] - cof * x[n - 1]`` along the frame axis.
+    The last sample of every channel is kept between calls, so the first
+    sample of a chunk is filtered with the last sample of the previous one.
+    """
+
+    def __init__(self, cof: float = 0.95, axis: int = 0, in_place: bool = False):
+        """Create a PreEmphasis element.
 
         Args:
             cof (float): The pre-emphasising coefficient. 0 equals to no
                 filtering.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
+            in_place (bool): Writes the result into the input array when it is
+                a writable floating point array.
         """
         self.cof = cof
+        self.axis = axis
+        self.in_place = in_place
+        self.reset()
+
+    def reset(self):
+        """Discards the last sample of the previous chunk"""
+        self.__last = None
+        self.__scratch = None
 
-    @profile
     def process(self, data : ndarray) -> ndarray:
         """Perform a pre-emphasis filter on an N-dimensional array.
 
-        Apply a pre-emphasis filter to the input array using a local
-        window-size given by `kernel_size`
+        Args:
+            data (ndarray): An array containing the data
+
+        Returns:
+            An array the same size as input containing the filtered data.
+        """
+        frames = np.moveaxis(data, self.axis, 0)
+        dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.float64
+        if self.__last is None or self.__last.shape != frames.shape[1:]:
+            self.__last = np.zeros(shape=frames.shape[1:], dtype=dtype)
+        if self.__scratch is None or self.__scratch.shape != frames.shape or self.__scratch.dtype != dtype:
+            self.__scratch = np.empty(shape=frames.shape, dtype=dtype)
+        if not len(frames):
+            return data
+
+        # The delayed and scaled signal is computed before the output is written, as both may share the memory
+        np.multiply(self.__last, self.cof, out=self.__scratch[0])
+        np.multiply(frames[:-1], self.cof, out=self.__scratch[1:])
+        self.__last[...] = frames[-1]
+
+        if self.in_place and frames.dtype == dtype and frames.flags.writeable:
+            np.subtract(frames, self.__scratch, out=frames)
+            return data
+        return np.moveaxis(np.subtract(frames, self.__scratch, dtype=dtype), 0, self.axis)
+
+
+class DeEmphasis:
+    """This class inverts the pre-emphasis filter on an N-dimensional array.
+
+    The filter computes ``y[n] = x[n] + cof * y[n - 1]`` along the frame axis,
+    keeping the last output of every channel between calls.
+    """
+
+    def __init__(self, cof: float = 0.95, axis: int = 0):
+        """Create a DeEmphasis element.
+
+        Args:
+            cof (float): The pre-emphasising coefficient used to filter the
+                signal.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
+        """
+        self.cof = cof
+        self.axis = axis
+        self.reset()
+
+    def reset(self):
+        """Discards the last output of the previous chunk"""
+        self.__zi = None
+
+    def process(self, data : ndarray) -> ndarray:
+        """Perform a de-emphasis filter on an N-dimensional array.
 
         Args:
             data (ndarray): An array containing the data
 
         Returns:
-            An array the same size as input containing the filtered data and the
-            dictionary.
+            An array the same size as input containing the filtered data,
+            with the data type of the input for floating point data.
         """
-        # TODO: replace this with an implementation with numpy
-        return preemphasis(signal=data, cof=self.cof)
+        axis = self.axis % data.ndim
+        shape = data.shape[:axis] + (1, ) + data.shape[axis + 1:]
+        if self.__zi is None or self.__zi.shape != shape:
+            self.__zi = np.zeros(shape=shape, dtype=np.float64)
+        result, self.__zi = signal.lfilter([1.0], [1.0, -self.cof], data, axis=axis, zi=self.__zi)
+        if np.issubdtype(data.dtype, np.floating):
+            # The recursion runs in double precision, the output keeps the precision of the input
+            return result.astype(data.dtype, copy=False)
+        return result
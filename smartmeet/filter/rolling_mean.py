@@ -1,30 +1,45 @@
 import numpy
-from profilehooks import profile
 
 
 class RollingMean:
-    """This class perform a mean filter on an N-dimensional array."""
+    """This class perform a mean filter on an N-dimensional array.
 
-    def __init__(self, kernel_size: int):
+    The filter is applied as a stream: every output sample is the mean of the
+    last `kernel_size` input samples of its channel, including the samples
+    received in previous calls. The stream is assumed to be preceded by
+    zeros.
+
+    The window sum is updated recursively, adding the incoming sample and
+    removing the outgoing one, so the cost per sample does not depend on the
+    kernel size. To avoid the accumulation of rounding errors over long
+    streams, the sum is periodically recomputed from the samples stored in
+    the window.
+    """
+
+    def __init__(self, kernel_size: int, axis: int = 0, anchor: int = 1 << 20):
         """Create a RollingMean element.
 
         Args:
-            kernel_size (int): A scalar or an N-length list giving the size of
-                the mean filter window in each dimension.
+            kernel_size (int): Size of the mean filter window in samples.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
+            anchor (int): Number of samples between two exact recomputations
+                of the window sum
         """
+        if kernel_size < 1:
+            raise ValueError("The kernel size must be a positive number")
         self.kernel_size = kernel_size
+        self.axis = axis
+        self.anchor = anchor
+        self.reset()
 
-    @staticmethod
-    def __running_mean(data, kernel_size):
-        """
-        Args:
-            data:
-            kernel_size:
-        """
-        cumsum = numpy.cumsum(numpy.insert(data, 0, 0))
-        return (cumsum[kernel_size:] - cumsum[:-kernel_size]) / float(kernel_size)
+    def reset(self):
+        """Discards the history of the stream"""
+        self.__window = None
+        self.__sum = None
+        self.__position = 0
+        self.__pending = 0
 
-    @profile
     def process(self, data: numpy.ndarray) -> numpy.ndarray:
         """Perform a mean filter on an N-dimensional array.
 
@@ -37,4 +52,38 @@ class RollingMean:
         Returns:
             An array the same size as input containing the mean filtered result.
         """
-        return RollingMean.__running_mean(data=data, kernel_size=self.kernel_size)
+        frames = numpy.moveaxis(data, self.axis, 0)
+        shape = frames.shape
+        frames = frames.reshape(shape[0], -1)
+        if self.__window is None or self.__window.shape[1] != frames.shape[1]:
+            self.__window = numpy.zeros(shape=[self.kernel_size, frames.shape[1]], dtype=numpy.float64)
+            self.__sum = numpy.zeros(shape=[frames.shape[1]], dtype=numpy.float64)
+            self.__position = 0
+            self.__pending = 0
+
+        count = len(frames)
+        stored = min(count, self.kernel_size)
+        slots = (self.__position + numpy.arange(count - stored, count)) % self.kernel_size
+
+        # The sample leaving the window when the i-th sample arrives was received kernel_size samples before it
+        leaving = numpy.empty(shape=frames.shape, dtype=numpy.float64)
+        leaving[:stored] = self.__window.take((self.__position + numpy.arange(stored)) % self.kernel_size, axis=0)
+        leaving[stored:] = frames[:count - stored]
+
+        result = numpy.subtract(frames, leaving, out=leaving)
+        numpy.cumsum(result, axis=0, out=result)
+        result += self.__sum
+        if count:
+            self.__sum[:] = result[-1]
+        result /= self.kernel_size
+
+        self.__window[slots] = frames[count - stored:]
+        self.__position = (self.__position + count) % self.kernel_size
+        self.__pending += count
+        if self.__pending >= self.anchor:
+            self.__window.sum(axis=0, out=self.__sum)
+            self.__pending = 0
+
+        if numpy.issubdtype(data.dtype, numpy.floating):
+            result = result.astype(data.dtype, copy=False)
+        return numpy.moveaxis(result.reshape(shape), 0, self.axis)
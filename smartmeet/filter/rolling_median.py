@@ -1,20 +1,48 @@
-from scipy import signal
+from bisect import bisect_left, insort
+
+import numpy
 from numpy import ndarray
-from profilehooks import profile
 
 class RollingMedian:
-    """This class perform a median filter on an N-dimensional array."""
+    """This class perform a median filter on an N-dimensional array.
+
+    The filter is applied as a stream: every output sample is the median of
+    the last `kernel_size` input samples of its channel, including the
+    samples received in previous calls. As with scipy.signal.medfilt, the
+    signal is assumed to be preceded by zeros.
+
+    Every channel keeps its window twice: in arrival order, as a ring, and
+    sorted. When a sample arrives the outgoing one is located in the sorted
+    window by bisection and replaced, so the cost of every update grows with
+    log(kernel_size) comparisons plus a memory move, instead of the full sort
+    of every window done by medfilt.
+
+    Note:
+        The filter is causal, so compared with the centered window of
+        scipy.signal.medfilt its output is delayed by (kernel_size - 1) / 2
+        samples.
+    """
 
-    def __init__(self, kernel_size: int):
+    def __init__(self, kernel_size: int, axis: int = 0):
         """Create a RollingMedian element.
 
         Args:
-            kernel_size (int): A scalar or an N-length list giving the size of
-                the median filter window in each dimension.
+            kernel_size (int): Size of the median filter window in samples.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
         """
+        if kernel_size < 1:
+            raise ValueError("The kernel size must be a positive number")
         self.kernel_size = kernel_size
+        self.axis = axis
+        self.reset()
+
+    def reset(self):
+        """Discards the history of the stream"""
+        self.__rings = None
+        self.__windows = None
+        self.__position = 0
 
-    @profile
     def process(self, data : ndarray) -> ndarray:
         """Perform a median filter on an N-dimensional array.
 
@@ -28,4 +56,45 @@ class RollingMedian:
             An array the same size as input containing the median filtered
             result.
         """
-        return signal.medfilt(data, kernel_size=self.kernel_size)
+        frames = numpy.moveaxis(data, self.axis, 0)
+        shape = frames.shape
+        frames = frames.reshape(shape[0], -1)
+        if self.__rings is None or len(self.__rings) != frames.shape[1]:
+            self.__rings = [[0.0] * self.kernel_size for _ in range(frames.shape[1])]
+            self.__windows = [[0.0] * self.kernel_size for _ in range(frames.shape[1])]
+            self.__position = 0
+
+        result = numpy.empty(shape=frames.shape, dtype=numpy.float64)
+        for channel, samples in enumerate(frames.T.tolist()):
+            result[:, channel] = self.__filter(samples, self.__rings[channel], self.__windows[channel])
+        self.__position = (self.__position + len(frames)) % self.kernel_size
+
+        if numpy.issubdtype(data.dtype, numpy.floating):
+            result = result.astype(data.dtype, copy=False)
+        return numpy.moveaxis(result.reshape(shape), 0, self.axis)
+
+    def __filter(self, samples: list, ring: list, window: list) -> list:
+        """Slides the window of a channel over the given samples
+
+        Args:
+            samples (list): Incoming samples of the channel
+            ring (list): Window in arrival order
+            window (list): Window in ascending order
+
+        Returns:
+            The median of the window after every sample
+        """
+        size = self.kernel_size
+        middle = size // 2
+        even = size % 2 == 0
+        position = self.__position
+        medians = []
+        for sample in samples:
+            del window[bisect_left(window, ring[position])]
+            insort(window, sample)
+            ring[position] = sample
+            position += 1
+            if position == size:
+                position = 0
+            medians.append((window[middle - 1] + window[middle]) * 0.5 if even else window[middle])
+        return medians
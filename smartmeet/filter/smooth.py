@@ -1,55 +1,69 @@
+from functools import lru_cache
+
+import numpy as np
 from scipy import signal
 from numpy import ndarray
-from profilehooks import profile
 
 class Smooth:
     """This class perform a smooth filter on an N-dimensional array.
 
-    Notes:
-        Details on the `mode` options:
-
-            'mirror':
-                Repeats the values at the edges in reverse order. The value
-                closest to the edge is not included.
-
-            'nearest':
-                The extension contains the nearest input value.
-
-            'wrap':
-                The extension contains the values from the other end of the
-                array.
+    The smoothing is a Savitzky-Golay filter: a polynomial of order
+    `polyorder` is fitted to every window of `kernel_size` samples and
+    evaluated at a fixed position of the window. As the fit is linear in the
+    samples, it reduces to a FIR filter whose coefficients only depend on the
+    window, the order and the evaluation position. The coefficients are
+    computed once and shared by every instance.
 
-        For example, if the input is [1, 2, 3, 4, 5, 6, 7, 8], and `kernel_size`
-        is 7, the following shows the extended data for the various `mode`
-        options::
+    The filter is applied as a stream, the last `kernel_size - 1` samples of
+    every channel are kept between calls, so smoothing a chunk costs a single
+    convolution and there are no edge effects at the chunk boundaries.
 
-            mode       |   Ext   |         Input          |   Ext
-            -----------+---------+------------------------+---------
-            'mirror'   | 4  3  2 | 1  2  3  4  5  6  7  8 | 7  6  5
-            'nearest'  | 1  1  1 | 1  2  3  4  5  6  7  8 | 8  8  8
-            'constant' | 0  0  0 | 1  2  3  4  5  6  7  8 | 0  0  0
-            'wrap'     | 6  7  8 | 1  2  3  4  5  6  7  8 | 1  2  3
+    Notes:
+        The output is delayed by `latency` samples. The default latency of
+        (kernel_size - 1) / 2 evaluates the polynomial at the center of the
+        window, as scipy.signal.savgol_filter does. A latency of zero
+        evaluates it at the newest sample, trading smoothness for delay.
     """
 
-    def __init__(self, kernel_size: int, polyorder: int, mode='interp'):
-        """Create a RollingMedian element.
-
-        extension to use for the padded signal to which the filter is
-        applied.
+    def __init__(self, kernel_size: int, polyorder: int, latency: int = None, axis: int = 0):
+        """Create a Smooth element.
 
         Args:
             kernel_size (int): The length of the filter window (i.e. the number
-                of coefficients).
+                of coefficients). Must be odd, so the window has a center
+                sample.
             polyorder (int): The order of the polynomial used to fit the
                 samples.
-            mode: Must be 'mirror', 'nearest', 'wrap' or 'interp'. This
-                determines the type of
+            latency (int): Delay of the output in samples, must be in the range
+                [0, kernel_size). Defaults to the center of the window.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
         """
-        self.mode = mode
+        if kernel_size < 1 or kernel_size % 2 == 0:
+            raise ValueError("The kernel size must be a positive odd number")
+        if latency is None:
+            latency = (kernel_size - 1) // 2
+        if not 0 <= latency < kernel_size:
+            raise ValueError("The latency must be in the range [0, %d)" % kernel_size)
         self.polyorder = polyorder
         self.kernel_size = kernel_size
+        self.latency = latency
+        self.axis = axis
+        self.__coefficients = Smooth.__design(kernel_size, polyorder, kernel_size - 1 - latency)
+        self.__zi = None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def __design(kernel_size: int, polyorder: int, position: int) -> ndarray:
+        """Computes the FIR coefficients evaluating the fitted polynomial at the given position of the window"""
+        coefficients = signal.savgol_coeffs(kernel_size, polyorder, pos=position, use='conv')
+        coefficients.flags.writeable = False
+        return coefficients
+
+    def reset(self):
+        """Discards the history of the stream"""
+        self.__zi = None
 
-    @profile
     def process(self, data : ndarray) -> ndarray:
         """Perform a smoothing filter on an N-dimensional array.
 
@@ -60,6 +74,15 @@ class Smooth:
             data (ndarray): An array containing the data
 
         Returns:
-            An array the same size as input containing the filtered result.
+            An array the same size as input containing the filtered result,
+            with the data type of the input for floating point data.
         """
-        return signal.savgol_filter(data, window_length=self.kernel_size, polyorder=self.polyorder, mode=self.mode, axis=1)
+        axis = self.axis % data.ndim
+        shape = data.shape[:axis] + (self.kernel_size - 1, ) + data.shape[axis + 1:]
+        if self.__zi is None or self.__zi.shape != shape:
+            self.__zi = np.zeros(shape=shape, dtype=np.float64)
+        result, self.__zi = signal.lfilter(self.__coefficients, 1.0, data, axis=axis, zi=self.__zi)
+        if data.dtype.kind == 'f':
+            # The filter runs in double precision, the output keeps the precision of the input
+            return result.astype(data.dtype, copy=False)
+        return result
@@ -0,0 +1,101 @@
+import numpy
+
+from smartmeet.core.source import Source
+from smartmeet.io.pacer import Pacer
+
+
+class ArraySource(Source):
+    """This class streams the samples stored in an array
+
+    The array, which may be a numpy.memmap of a large recording, is streamed in frames of shape
+    [frames_per_buffer, channels]. Every frame is a read-only view of the array, so no sample is copied. The last
+    frame is shorter when the length of the array is not a multiple of the frame size; the number of frames is
+    reported in the `frames` entry of the extra information.
+
+    The timestamps are derived from the position in the array, so repeated runs are deterministic. By default the
+    frames are produced as fast as the pipeline consumes them; in real-time mode they are paced to the wall clock.
+    """
+
+    def __init__(self,
+                 data: numpy.ndarray,
+                 rate: int,
+                 frames_per_buffer: int = None,
+                 realtime: bool = False,
+                 name: str = ""):
+        """Creates an ArraySource streaming the given samples
+
+        Args:
+            data (numpy.ndarray): Samples to stream, [frames] or [frames, channels]
+            rate (int): The sampling rate in Hz
+            frames_per_buffer (int): Number of frames per buffer. Defaults to 10 ms of audio.
+            realtime (bool): Paces the frames to the wall clock
+            name (str): Name of the element
+        """
+        super().__init__(name)
+        if data.ndim not in (1, 2):
+            raise ValueError("The data must be laid out as [frames] or [frames, channels]")
+        self.__data = data.view()
+        self.__data.flags.writeable = False
+        if self.__data.ndim == 1:
+            self.__data = self.__data[:, numpy.newaxis]
+        self.__rate = rate
+        self.__frames_per_buffer = int(frames_per_buffer if frames_per_buffer else rate // 100)
+        self.__pacer = Pacer(rate=rate, enabled=realtime)
+        self.__position = 0
+
+    @property
+    def sample_rate(self) -> int:
+        """Return the sampling rate in Hz."""
+        return self.__rate
+
+    @property
+    def channels(self) -> int:
+        """Return the number of channels."""
+        return self.__data.shape[1]
+
+    @property
+    def frames(self) -> int:
+        """ Number of available frames"""
+        return len(self.__data)
+
+    @property
+    def frames_per_buffer(self) -> int:
+        """Returns the number of frames per channel of every buffer"""
+        return self.__frames_per_buffer
+
+    @property
+    def realtime(self) -> bool:
+        """Checks if the frames are paced to the wall clock"""
+        return self.__pacer.enabled
+
+    def done(self) -> bool:
+        """Checks if there still data to stream"""
+        return self.__position >= len(self.__data)
+
+    def start(self):
+        """Starts the streaming from the beginning of the array"""
+        self.__position = 0
+        self.__pacer.start()
+
+    def stop(self):
+        """Stops the streaming by moving to the end of the array"""
+        self.__position = len(self.__data)
+
+    def timestamp(self):
+        """Returns the current streaming timestamp in seconds"""
+        return self.__position / float(self.__rate)
+
+    def process(self):
+        """Returns the next frame of the array
+
+        Returns:
+            A read-only view of shape [frames_per_buffer, channels] and a dictionary with its timestamp in seconds,
+            the sampling rate and the number of frames.
+        """
+        if self.done():
+            raise EOFError("The end of the array has been reached")
+        frame = self.__data[self.__position:self.__position + self.__frames_per_buffer]
+        extra = {"timestamp": self.timestamp(), "rate": self.__rate, "frames": len(frame)}
+        self.__position += len(frame)
+        self.__pacer.wait(self.__position)
+        return frame, extra
@@ -1,17 +1,64 @@
+import queue
+import threading
+
+import numpy
 from soundfile import SoundFile
 
-class Decoder:
-    """This class is an interface to read data from an audio file"""
+from smartmeet.core.pool import BufferPool
+from smartmeet.core.source import Source
+
+
+class Decoder(Source):
+    """This class is an interface to read data from an audio file
+
+    The decoder streams the file in fixed-size frames of shape [frames_per_buffer, channels]. The number of frames
+    read from the file is reported in the `frames` entry of the extra information. The last frame is padded with
+    zeros; only that frame has a `valid_frames` entry, telling the elements how many of its frames are not padding.
+
+    Frames are read into a small set of buffers borrowed from the BufferPool by a background thread that stays
+    `read_ahead` blocks ahead of the pipeline, so the memory used does not depend on the length of the file.
+
+    Note:
+        When `reuse_buffers` is enabled, a frame is only valid until the next call to `process`. Elements keeping
+        frames for later use must copy them, as the stages of a parallel pipeline do.
+    """
 
-    def __init__(self, file: str):
+    __END = object()
+
+    def __init__(self,
+                 file: str,
+                 frames_per_buffer: int = None,
+                 read_ahead: int = 4,
+                 reuse_buffers: bool = True,
+                 name: str = ""):
         """Creates an instance of a Decoder source with the given configuration
 
         Args:
-            file_name (str): Input file name
-            frames_per_buffer (int): Number of frames per buffer.
+            file (str): Input file name
+            frames_per_buffer (int): Number of frames per buffer. Defaults to 10 ms of audio.
+            read_ahead (int): Number of buffers read in advance by the background thread. Zero disables the thread.
+            reuse_buffers (bool): Recycles the buffers once the pipeline has processed them.
             name (str): Name of the element
         """
+        super().__init__(name)
+        if read_ahead < 0:
+            raise ValueError("The number of read-ahead blocks must be a positive number or zero")
+
         self.__instance = SoundFile(file=file, mode='r')
+        self.__frames_per_buffer = int(frames_per_buffer if frames_per_buffer else self.__instance.samplerate // 100)
+        self.__read_ahead = read_ahead
+        self.__reuse_buffers = reuse_buffers
+        self.__position = 0
+        self.__current = None
+        self.__ready = queue.Queue(maxsize=max(read_ahead, 1))
+        self.__running = threading.Event()
+        self.__stopped = False
+        self.__thread = None
+
+        if reuse_buffers:
+            shape = (self.__frames_per_buffer, self.__instance.channels)
+            for buffer in [BufferPool().acquire(shape, numpy.float32) for _ in range(read_ahead + 1)]:
+                BufferPool().release(buffer)
 
     @property
     def sample_rate(self) -> int:
@@ -33,21 +80,55 @@ class Decoder:
         """ Number of available frames"""
         return self.__instance.frames
 
+    @property
+    def frames_per_buffer(self) -> int:
+        """Returns the number of frames per channel of every buffer"""
+        return self.__frames_per_buffer
+
+    @property
+    def read_ahead(self) -> int:
+        """Returns the number of buffers read in advance"""
+        return self.__read_ahead
+
     def done(self) -> bool:
-        """Checks if there still data to read from the audio file"""
-        return self.__instance.tell() < self.__instance.frames
+        """Checks if the streaming has been stopped or there is no more data to read from the audio file"""
+        return self.__stopped or self.__position >= self.__instance.frames
 
     def start(self):
         """Starts the streaming"""
+        self.__join()
+        self.__recycle()
         self.__instance.seek(0)
+        self.__position = 0
+        self.__stopped = False
+        if self.__read_ahead:
+            self.__running.set()
+            self.__thread = threading.Thread(target=self.__loop, name="smartmeet-decoder", daemon=True)
+            self.__thread.start()
 
     def stop(self):
-        """Stops the streaming by seeking the file to the end"""
-        self.__instance.seek(self.__instance.frames)
+        """Stops the streaming
+
+        The read-ahead thread is only signalled, and a call to `process` waiting for the next block is woken up, so
+        the streaming can be stopped from another thread without blocking. The thread is joined by the next call to
+        `start` or `close`.
+        """
+        self.__stopped = True
+        self.__running.clear()
+        try:
+            self.__ready.put_nowait(Decoder.__END)
+        except queue.Full:
+            # The queue is only full when no call to process is waiting for a block
+            pass
+
+    def close(self):
+        """Stops the streaming and closes the audio file"""
+        self.__join()
+        self.__instance.close()
 
     def timestamp(self):
         """Returns the current streaming timestamp in seconds"""
-        return self.__instance.tell() / self.__instance.samplerate
+        return self.__position / self.__instance.samplerate
 
     def seek(self, frames: int):
         """Set the read position.
@@ -58,12 +139,103 @@ class Decoder:
         Returns:
             The new absolute read/write position in frames
         """
-        return self.__instance.seek(frames=frames)
+        if self.__thread is not None:
+            raise RuntimeError("The read position can not be changed while streaming")
+        self.__position = self.__instance.seek(frames=frames)
+        return self.__position
 
-    def read(self, frames_per_channel: int = -1):
-        """Returns the buffer read from the audio file"""
+    def read(self, frames_per_channel: int = -1, out: numpy.ndarray = None):
+        """Returns the buffer read from the audio file
+
+        Args:
+            frames_per_channel (int): Number of frames to read, by default the whole file
+            out (numpy.ndarray): Optional float32 buffer to read into. Its length sets the number of frames.
+        """
+        if out is not None:
+            return self.__instance.read(dtype='float32', always_2d=out.ndim > 1, out=out)
 
-        if frames_per_channel is -1:
+        if frames_per_channel == -1:
             frames_per_channel = self.__instance.frames
 
         return self.__instance.read(frames=frames_per_channel, dtype='float32', always_2d=False)
+
+    def process(self):
+        """Returns the next frame of the audio file
+
+        Returns:
+            A buffer of shape [frames_per_buffer, channels] and a dictionary with its timestamp in seconds, the
+            sampling rate and the number of frames read. The padded last buffer also reports its number of valid
+            frames in the `valid_frames` entry. The data is None when the streaming is stopped while waiting for the
+            block.
+        """
+        self.__recycle()
+        if self.__read_ahead:
+            item = self.__ready.get()
+            if item is Decoder.__END:
+                if self.__stopped:
+                    return None, {"timestamp": self.timestamp(), "rate": self.sample_rate}
+                raise EOFError("The end of the file %s has been reached" % self.file_name)
+            buffer, frames = item
+        else:
+            buffer, frames = self.__fill(self.__acquire())
+
+        extra = {"timestamp": self.timestamp(), "rate": self.sample_rate, "frames": frames}
+        if frames < len(buffer):
+            extra["valid_frames"] = frames
+        self.__position += frames
+        self.__current = buffer
+        return buffer, extra
+
+    def __allocate(self) -> numpy.ndarray:
+        return numpy.zeros(shape=[self.__frames_per_buffer, self.__instance.channels], dtype=numpy.float32)
+
+    def __acquire(self) -> numpy.ndarray:
+        if not self.__reuse_buffers:
+            return self.__allocate()
+        return BufferPool().acquire((self.__frames_per_buffer, self.__instance.channels), numpy.float32)
+
+    def __release(self, buffer: numpy.ndarray):
+        """Returns a buffer to the pool"""
+        if self.__reuse_buffers:
+            BufferPool().release(buffer)
+
+    def __recycle(self):
+        """Returns the buffer handed out in the previous call to the pool"""
+        if self.__current is not None:
+            self.__release(self.__current)
+        self.__current = None
+
+    def __fill(self, buffer: numpy.ndarray) -> tuple:
+        """Reads the next block into the given buffer, padding it with zeros at the end of the file"""
+        frames = len(self.__instance.read(dtype='float32', always_2d=True, out=buffer))
+        buffer[frames:] = 0
+        return buffer, frames
+
+    def __loop(self):
+        """Reads blocks in advance until the end of the file or until the streaming is stopped"""
+        while self.__running.is_set():
+            buffer, frames = self.__fill(self.__acquire())
+            if not frames:
+                self.__release(buffer)
+                self.__ready.put(Decoder.__END)
+                return
+            self.__ready.put((buffer, frames))
+
+    def __join(self):
+        """Stops the read-ahead thread and returns the pending buffers to the pool"""
+        if self.__thread is None:
+            return
+        self.__running.clear()
+        while self.__thread.is_alive():
+            try:
+                item = self.__ready.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            if item is not Decoder.__END:
+                self.__release(item[0])
+        self.__thread.join()
+        self.__thread = None
+        while not self.__ready.empty():
+            item = self.__ready.get_nowait()
+            if item is not Decoder.__END:
+                self.__release(item[0])
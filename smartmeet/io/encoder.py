@@ -1,12 +1,34 @@
+import queue
+import threading
+from time import perf_counter
+
+import numpy
 from soundfile import SoundFile
 
+from smartmeet.core.profiler import ProfilerReport
 from smartmeet.core.sink import Sink
+from smartmeet.utils.converter import Converter
 
 
 class Encoder(Sink):
-    """This class is an interface to write data into an audio file"""
+    """This class is an interface to write data into an audio file
+
+    In write-behind mode the incoming frames are copied into large preallocated batches which are written by a
+    dedicated thread, so a slow disk does not stall the pipeline thread. The number of batches in flight is bounded
+    by `queue_size`: once every batch is waiting to be written, the pipeline blocks until the writer catches up.
+    The batches are allocated with the data type of the first chunk, so 16-bit samples are written as such.
+    """
+
+    __STOP = object()
 
-    def __init__(self, file_name: str, rate: int, channels: int, name: str = ""):
+    def __init__(self,
+                 file_name: str,
+                 rate: int,
+                 channels: int,
+                 name: str = "",
+                 write_behind: bool = False,
+                 batch_frames: int = None,
+                 queue_size: int = 16):
         """Creates an instance of a Encoder source with the given configuration
 
         Args:
@@ -14,9 +36,29 @@ class Encoder(Sink):
             rate (int): The sample rate of the file in Hz
             channels (int): The number of channels
             name (str): Name of the element
+            write_behind (bool): Writes the data from a background thread
+            batch_frames (int): Number of frames grouped in every write. Defaults to one second of audio.
+            queue_size (int): Maximum number of batches waiting to be written
         """
         super().__init__(name)
         self.__instance = SoundFile(file=file_name, mode='w', samplerate=rate, channels=channels)
+        self.__write_behind = write_behind
+        self.__thread = None
+        self.__error = None
+
+        if write_behind:
+            if queue_size < 1:
+                raise ValueError("The queue size must be a positive number")
+            self.__batch_frames = int(batch_frames if batch_frames else rate)
+            self.__queue_size = queue_size
+            self.__free = queue.Queue()
+            self.__pending = queue.Queue()
+            # The batches are allocated with the data type of the first chunk
+            self.__batch = None
+            self.__filled = 0
+            self.__flush_latency = ProfilerReport(label="%s-flush" % (name if name else "encoder"))
+            self.__thread = threading.Thread(target=self.__loop, name="smartmeet-encoder", daemon=True)
+            self.__thread.start()
 
     @property
     def sample_rate(self) -> int:
@@ -33,19 +75,126 @@ class Encoder(Sink):
         """Return the file name."""
         return self.__instance.name
 
+    @property
+    def write_behind(self) -> bool:
+        """Checks if the data is written from a background thread"""
+        return self.__write_behind
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of batches waiting to be written"""
+        return self.__pending.qsize() if self.__write_behind else 0
+
+    @property
+    def flush_latency(self) -> ProfilerReport:
+        """Returns the statistics of the time spent writing every batch, or None if write-behind is disabled"""
+        return self.__flush_latency if self.__write_behind else None
+
     def seek(self, frames):
         """Set the write position.
 
         Args:
             frames: The frame index or offset to seek
         """
+        if self.__write_behind:
+            self.flush()
         return self.__instance.seek(frames=frames)
 
     def process(self, data, extra=None):
         """Writes the buffer of data into the audio file.
 
+        Only the first `extra["valid_frames"]` frames are written when the
+        extra information has that entry, so the padding of the last chunk of
+        a decoded file is not stored.
+
         Args:
             data: Array to write in the file
             extra: Any extra information previously computed.
         """
-        self.__instance.write(data.flatten()), extra
+        if isinstance(extra, dict) and extra.get("valid_frames") is not None:
+            data = data[:extra["valid_frames"]]
+        if not self.__write_behind:
+            self.__instance.write(data)
+            return
+
+        if self.__error is not None:
+            raise self.__error
+        if self.__thread is None:
+            raise RuntimeError("The encoder has already been closed")
+
+        frames = data.reshape(len(data), -1)
+        if self.__batch is None:
+            for _ in range(self.__queue_size):
+                self.__free.put(numpy.zeros(shape=[self.__batch_frames, self.channels], dtype=frames.dtype))
+            self.__batch = self.__free.get()
+        offset = 0
+        while offset < len(frames):
+            count = min(len(frames) - offset, len(self.__batch) - self.__filled)
+            Encoder.__copy(frames[offset:offset + count], self.__batch[self.__filled:self.__filled + count])
+            self.__filled += count
+            offset += count
+            if self.__filled == len(self.__batch):
+                self.__submit()
+
+    def flush(self):
+        """Blocks until every frame received so far has been written"""
+        if not self.__write_behind or self.__thread is None:
+            return
+        if self.__filled:
+            self.__submit()
+        self.__pending.join()
+        if self.__error is not None:
+            raise self.__error
+
+    def stop(self):
+        """Writes every pending frame and stops the writer thread"""
+        if self.__thread is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.__pending.put(Encoder.__STOP)
+            self.__thread.join()
+            self.__thread = None
+
+    def close(self):
+        """Writes every pending frame and closes the audio file"""
+        try:
+            self.stop()
+        finally:
+            self.__instance.close()
+
+    @staticmethod
+    def __copy(frames: numpy.ndarray, out: numpy.ndarray):
+        """Copies frames into a batch, scaling 16-bit samples stored in a floating point batch and vice versa"""
+        if frames.dtype == numpy.int16 and out.dtype.kind == 'f':
+            Converter.fromInt16ToFloat(frames, out=out)
+        elif frames.dtype.kind == 'f' and out.dtype == numpy.int16:
+            Converter.fromFloatToInt16(frames, out=out)
+        else:
+            out[...] = frames
+
+    def __submit(self):
+        """Hands the current batch to the writer thread and takes a free one"""
+        self.__pending.put((self.__batch, self.__filled))
+        self.__batch = self.__free.get()
+        self.__filled = 0
+
+    def __loop(self):
+        """Writes the submitted batches until the stop token is received"""
+        while True:
+            item = self.__pending.get()
+            if item is Encoder.__STOP:
+                self.__pending.task_done()
+                return
+            batch, frames = item
+            try:
+                if self.__error is None:
+                    start = perf_counter()
+                    self.__instance.write(batch[:frames])
+                    self.__flush_latency.record(perf_counter() - start)
+            except Exception as error:
+                self.__error = error
+            finally:
+                self.__free.put(batch)
+                self.__pending.task_done()
@@ -0,0 +1,189 @@
+import numpy
+
+from smartmeet.core.pool import BufferPool
+from smartmeet.core.source import Source
+from smartmeet.io.pacer import Pacer
+
+
+class GeneratorSource(Source):
+    """This class generates synthetic signals
+
+    The supported signals are:
+
+    * tone: A sinusoid of the given frequency, with a continuous phase between frames.
+    * noise: White Gaussian noise with a standard deviation equal to the amplitude, independent on every channel.
+    * speech: Speech-like bursts of a harmonic signal with a random pitch, shaped by a smooth envelope and separated by
+      pauses of low level noise.
+
+    The random numbers come from a generator seeded with `seed` when the streaming starts, so every run produces the
+    same samples with the same timestamps. By default the frames are generated as fast as the pipeline consumes them;
+    in real-time mode they are paced to the wall clock.
+
+    Note:
+        When `reuse_buffers` is enabled, a frame is only valid until the next call to `process`.
+    """
+
+    SIGNALS = ("tone", "noise", "speech")
+
+    def __init__(self,
+                 signal: str = "tone",
+                 rate: int = 16000,
+                 channels: int = 1,
+                 frames_per_buffer: int = None,
+                 duration: float = None,
+                 frequency: float = 440.0,
+                 amplitude: float = 0.5,
+                 seed: int = 0,
+                 realtime: bool = False,
+                 reuse_buffers: bool = True,
+                 name: str = ""):
+        """Creates a GeneratorSource with the given configuration
+
+        Args:
+            signal (str): Generated signal, one of 'tone', 'noise' or 'speech'
+            rate (int): The sampling rate in Hz
+            channels (int): Number of channels
+            frames_per_buffer (int): Number of frames per buffer. Defaults to 10 ms of audio.
+            duration (float): Duration of the stream in seconds. By default the stream does not end.
+            frequency (float): Frequency of the tone in Hz
+            amplitude (float): Peak amplitude of the tone and the speech, standard deviation of the noise
+            seed (int): Seed of the random number generator
+            realtime (bool): Paces the frames to the wall clock
+            reuse_buffers (bool): Recycles the buffers once the pipeline has processed them.
+            name (str): Name of the element
+        """
+        super().__init__(name)
+        if signal not in GeneratorSource.SIGNALS:
+            raise ValueError("Unknown signal %s. Expected one of %s" % (signal, ", ".join(GeneratorSource.SIGNALS)))
+        self.__signal = signal
+        self.__rate = rate
+        self.__channels = channels
+        self.__frames_per_buffer = int(frames_per_buffer if frames_per_buffer else rate // 100)
+        self.__frames = None if duration is None else int(round(duration * rate))
+        self.__frequency = frequency
+        self.__amplitude = amplitude
+        self.__seed = seed
+        self.__reuse_buffers = reuse_buffers
+        self.__pacer = Pacer(rate=rate, enabled=realtime)
+        self.__stopped = False
+        self.__current = None
+        self.start()
+
+    @property
+    def signal(self) -> str:
+        """Returns the generated signal"""
+        return self.__signal
+
+    @property
+    def sample_rate(self) -> int:
+        """Return the sampling rate in Hz."""
+        return self.__rate
+
+    @property
+    def channels(self) -> int:
+        """Return the number of channels."""
+        return self.__channels
+
+    @property
+    def frames(self):
+        """ Number of frames of the stream, None if it does not end"""
+        return self.__frames
+
+    @property
+    def frames_per_buffer(self) -> int:
+        """Returns the number of frames per channel of every buffer"""
+        return self.__frames_per_buffer
+
+    @property
+    def realtime(self) -> bool:
+        """Checks if the frames are paced to the wall clock"""
+        return self.__pacer.enabled
+
+    def done(self) -> bool:
+        """Checks if the stream has been stopped or has reached its duration"""
+        return self.__stopped or (self.__frames is not None and self.__position >= self.__frames)
+
+    def start(self):
+        """Starts the streaming from the beginning of the signal"""
+        self.__position = 0
+        self.__stopped = False
+        self.__random = numpy.random.RandomState(self.__seed)
+        self.__segment = 0
+        self.__voiced = False
+        self.__offset = 0
+        self.__pitch = 0.0
+        self.__pacer.start()
+
+    def stop(self):
+        """Stops the streaming, a later call to `start` generates the whole signal again"""
+        self.__stopped = True
+
+    def timestamp(self):
+        """Returns the current streaming timestamp in seconds"""
+        return self.__position / float(self.__rate)
+
+    def process(self):
+        """Returns the next frame of the signal
+
+        Returns:
+            A buffer of shape [frames_per_buffer, channels] and a dictionary with its timestamp in seconds, the
+            sampling rate and the number of frames.
+        """
+        if self.done():
+            raise EOFError("The end of the stream has been reached")
+        count = self.__frames_per_buffer
+        if self.__frames is not None:
+            count = min(count, self.__frames - self.__position)
+
+        shape = (count, self.__channels)
+        if self.__reuse_buffers:
+            buffer = self.__current = BufferPool().recycle(self.__current, shape, numpy.float32)
+        else:
+            buffer = numpy.empty(shape=shape, dtype=numpy.float32)
+
+        if self.__signal == "tone":
+            phase = (self.__position + numpy.arange(count)) * (2.0 * numpy.pi * self.__frequency / self.__rate)
+            buffer[...] = (self.__amplitude * numpy.sin(phase))[:, numpy.newaxis]
+        elif self.__signal == "noise":
+            buffer[...] = self.__random.standard_normal(size=shape) * self.__amplitude
+        else:
+            buffer[...] = self.__speech(count)[:, numpy.newaxis]
+
+        extra = {"timestamp": self.timestamp(), "rate": self.__rate, "frames": count}
+        self.__position += count
+        self.__pacer.wait(self.__position)
+        return buffer, extra
+
+    def __speech(self, count: int) -> numpy.ndarray:
+        """Generates the next samples of the speech-like signal
+
+        The signal alternates voiced bursts of 100 to 400 ms, with a pitch between 90 and 250 Hz, and pauses of 50 to
+        300 ms.
+
+        Args:
+            count (int): Number of samples
+        """
+        result = numpy.empty(shape=[count], dtype=numpy.float64)
+        position = 0
+        while position < count:
+            if self.__offset == self.__segment:
+                self.__voiced = not self.__voiced
+                limits = (0.1, 0.4) if self.__voiced else (0.05, 0.3)
+                self.__segment = max(int(self.__random.uniform(*limits) * self.__rate), 1)
+                self.__pitch = self.__random.uniform(90.0, 250.0)
+                self.__offset = 0
+
+            length = min(count - position, self.__segment - self.__offset)
+            output = result[position:position + length]
+            if self.__voiced:
+                time = self.__offset + numpy.arange(length, dtype=numpy.float64)
+                harmonics = numpy.arange(1, max(min(int(0.5 * self.__rate / self.__pitch), 20), 1) + 1)
+                phases = numpy.outer(time, harmonics) * (2.0 * numpy.pi * self.__pitch / self.__rate)
+                numpy.dot(numpy.sin(phases), 1.0 / harmonics, out=output)
+                output *= numpy.sin(numpy.pi * time / self.__segment) * self.__amplitude / numpy.sum(1.0 / harmonics)
+                output += self.__random.standard_normal(size=length) * (0.02 * self.__amplitude)
+            else:
+                output[...] = self.__random.standard_normal(size=length) * (0.005 * self.__amplitude)
+            self.__offset += length
+            position += length
+        return result
@@ -0,0 +1,43 @@
+import time
+
+
+class Pacer:
+    """Paces a stream of frames to the wall clock
+
+    Sources reading from memory or generating data can produce frames much faster than real time. When pacing is
+    enabled, `wait` sleeps until the wall clock reaches the timestamp of the next frame, so the source behaves like a
+    capture device. The deadline of every frame is computed from the start of the stream, so the sleeping errors do
+    not accumulate.
+    """
+
+    def __init__(self, rate: int, enabled: bool = False):
+        """Creates a Pacer for a stream with the given sampling rate
+
+        Args:
+            rate (int): The sampling rate in Hz
+            enabled (bool): Waits for the wall clock. When disabled the stream runs as fast as possible.
+        """
+        self.__rate = rate
+        self.__enabled = enabled
+        self.__origin = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        """Checks if the stream is paced to the wall clock"""
+        return self.__enabled
+
+    def start(self):
+        """Sets the start of the stream to the current time"""
+        self.__origin = time.perf_counter()
+
+    def wait(self, position: int):
+        """Waits until the frame at the given position is due
+
+        Args:
+            position (int): Index of the frame in the stream
+        """
+        if not self.__enabled:
+            return
+        delay = self.__origin + position / float(self.__rate) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
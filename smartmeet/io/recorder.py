@@ -1,13 +1,31 @@
-import time
-import queue
+import threading
+
 import numpy
 import pyaudio
+
+from smartmeet.core.logger import Logger
 from smartmeet.core.source import Source
+from smartmeet.core.stage import Backpressure
 
 
 class Recorder(Source):
     """This class is an interface to pyAudio that performs the retrieval of
     recorded audio buffers from an input device.
+
+    The audio callback copies every recorded buffer into a preallocated ring
+    of `capacity` frames and wakes up the pipeline thread, which receives the
+    frames as soon as they are available. When the ring is full the
+    `overflow` policy decides which frame is discarded, as the audio callback
+    can not block.
+
+    Note:
+        The frames returned by `process` are views of the ring. They remain
+        valid until the pipeline falls `capacity - 1` frames behind the sound
+        card.
+
+        In push mode the ring is bypassed: the audio callback runs the linked
+        elements with a read-only view of the PortAudio buffer, which is only
+        valid during the callback.
     """
 
     def __init__(self,
@@ -15,7 +33,10 @@ class Recorder(Source):
                  frames_per_buffer: int = None,
                  channels: int = 1,
                  device_name: str = "default",
-                 name: str = ""):
+                 name: str = "",
+                 capacity: int = 32,
+                 overflow: Backpressure = Backpressure.DROP_OLDEST,
+                 timeout: float = 1.0):
         """Creates an instance of a Recorder source with the given configuration
 
         Args:
@@ -23,13 +44,33 @@ class Recorder(Source):
             frames_per_buffer (int): Number of frames per buffer.
             channels (int): Number of channels
             device_name (str): Input device name
+            capacity (int): Number of buffers stored in the ring
+            overflow (Backpressure): Frame discarded when the ring is full,
+                either DROP_OLDEST or DROP_NEWEST
+            timeout (float): Maximum time in seconds to wait for a buffer
         """
         super().__init__(name)
-        self.__queue = queue.Queue()
+        overflow = Backpressure(overflow)
+        if overflow is Backpressure.BLOCK:
+            raise ValueError("The audio callback can not block, use DROP_OLDEST or DROP_NEWEST")
+        if capacity < 2:
+            raise ValueError("The capacity of the ring must be at least two buffers")
+
         self.__rate = rate
         self.__frames_per_buffer = int(frames_per_buffer if frames_per_buffer else rate // 100)
         self.__channels = channels
         self.__timestamp = 0
+        self.__overflow = overflow
+        self.__timeout = timeout
+        self.__ring = numpy.zeros(shape=[capacity, self.__frames_per_buffer, channels], dtype=numpy.float32)
+        self.__timestamps = numpy.zeros(shape=[capacity], dtype=numpy.float64)
+        self.__condition = threading.Condition()
+        self.__head = 0
+        self.__count = 0
+        self.__overflows = 0
+        self.__xruns = 0
+        self.__error = None
+        self.__stopped = False
         self.__instance = pyaudio.PyAudio()
 
         for i in range(self.__instance.get_device_count()):
@@ -65,7 +106,7 @@ class Recorder(Source):
         Args:
             data:
         """
-        result = numpy.fromstring(string=data, dtype=numpy.float32)
+        result = numpy.frombuffer(data, dtype=numpy.float32)
         return numpy.reshape(result, (self.frames_per_buffer, self.channels))
 
     def __audio_callback(self, in_data, frame_count, time_info, status):
@@ -76,8 +117,31 @@ class Recorder(Source):
             time_info:
             status:
         """
-        self.__queue.put(self.__decode(data=in_data))
-        self.__timestamp = time_info["current_time"]
+        if status & pyaudio.paInputOverflow:
+            self.__xruns += 1
+
+        if self.push_mode:
+            self.__timestamp = time_info["current_time"]
+            try:
+                self.push(self.__decode(data=in_data), {"timestamp": self.__timestamp, "rate": self.__rate})
+            except Exception as error:
+                self.__error = error
+                Logger().error("Aborting the audio streaming: %s" % error, "recorder")
+                return None, pyaudio.paAbort
+            return None, pyaudio.paContinue
+
+        with self.__condition:
+            if self.__count == len(self.__ring):
+                self.__overflows += 1
+                if self.__overflow is Backpressure.DROP_NEWEST:
+                    return None, pyaudio.paContinue
+                self.__head = (self.__head + 1) % len(self.__ring)
+                self.__count -= 1
+            slot = (self.__head + self.__count) % len(self.__ring)
+            self.__ring[slot] = self.__decode(data=in_data)
+            self.__timestamps[slot] = time_info["current_time"]
+            self.__count += 1
+            self.__condition.notify()
         return None, pyaudio.paContinue
 
     @property
@@ -100,17 +164,57 @@ class Recorder(Source):
         """Returns the number of frames per channel"""
         return self.__frames_per_buffer
 
+    @property
+    def supports_push(self) -> bool:
+        """The audio callback can drive the pipeline directly"""
+        return True
+
+    @property
+    def error(self):
+        """Returns the exception that aborted the streaming in push mode, if any"""
+        return self.__error
+
+    @property
+    def capacity(self) -> int:
+        """Returns the number of buffers stored in the ring"""
+        return len(self.__ring)
+
+    @property
+    def available(self) -> int:
+        """Returns the number of buffers waiting to be processed"""
+        return self.__count
+
+    @property
+    def overflows(self) -> int:
+        """Returns the number of buffers discarded because the ring was full"""
+        return self.__overflows
+
+    @property
+    def xruns(self) -> int:
+        """Returns the number of input overflows reported by the sound card"""
+        return self.__xruns
+
     def done(self) -> bool:
         """Checks if the stream is currently active"""
-        return self.__stream.is_stopped()
+        return self.__stream.is_stopped() or self.__error is not None
 
     def start(self):
         """Starts the audio streaming"""
+        with self.__condition:
+            self.__head = 0
+            self.__count = 0
+            self.__overflows = 0
+            self.__xruns = 0
+            self.__stopped = False
+        self.__error = None
         self.__stream.start_stream()
 
     def stop(self):
         """Stops the audio streaming"""
         self.__stream.stop_stream()
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
 
     def timestamp(self) -> float:
         """Returns the streaming timestamp in seconds"""
@@ -121,11 +225,26 @@ class Recorder(Source):
 
         If there is no data in the buffer, the function will wait until the
         next callback from the sound card is done and return the recorded data.
+        Once the streaming is stopped, the buffers left in the ring are still
+        returned, and then the function returns None without waiting.
 
         Returns:
-            Array containing the samples read from a file
-        """
-        while (self.__queue.empty()):
-            time.sleep(self.frames_per_buffer / self.sample_rate)
+            Array containing the samples recorded by the sound card and a
+            dictionary with its timestamp in seconds and the sampling rate,
+            or None as data when the streaming has been stopped.
 
-        return self.__queue.get()
+        Raises:
+            TimeoutError: If no buffer is recorded within the timeout.
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: self.__count > 0 or self.__stopped, timeout=self.__timeout):
+                raise TimeoutError("No audio buffer received from %s in %.3f seconds" %
+                                   (self.device_name, self.__timeout))
+            if not self.__count:
+                return None, {"timestamp": self.__timestamp, "rate": self.__rate}
+            slot = self.__head
+            self.__head = (self.__head + 1) % len(self.__ring)
+            self.__count -= 1
+            self.__timestamp = float(self.__timestamps[slot])
+
+        return self.__ring[slot], {"timestamp": self.__timestamp, "rate": self.__rate}
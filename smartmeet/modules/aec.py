@@ -1,18 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from speexdsp import EchoCanceller
+from smartmeet.core.pool import BufferPool
 from smartmeet.utils.converter import Converter
 
 class AEC:
+    """
+    This AEC class removes the echo of the played signal from the recorded one.
+
+    Every channel of the recording has its own canceller, so each microphone
+    adapts its own echo path. The playback is down-mixed to a single reference
+    channel shared by all the cancellers.
+
+    The samples of a block are converted to int16 once for all the channels.
+    The channels are then processed concurrently in a pool of threads, as the
+    native cancellers do not need the interpreter while they run.
+
+    Note:
+        This class operates only with buffers of `frames_per_channel` frames.
+        By default every call returns a new array. When `reuse_buffers` is
+        enabled, the output arrays are borrowed from the BufferPool and given
+        back on the next call, so an output is only valid until then. Enable
+        it only when the outputs are consumed before the next call, as in a
+        pipeline.
+    """
 
-    def __init__(self, channels: int, rate: int, frames_per_channel: int, filter_length: int):
-        super().__init__(name=name)
+    def __init__(self, channels: int, rate: int, frames_per_channel: int, filter_length: int, workers: int = None,
+                 reuse_buffers: bool = False):
+        """Creates an echo cancellation element with the given configuration
+
+        Args:
+            channels (int): Number of channels of the recorded signal
+            rate (int): The audio sample rate, in Hz.
+            frames_per_channel (int): Number of frames per channel of the processed buffers
+            filter_length (int): Number of frames of the echo path modelled by the cancellers
+            workers (int): Number of threads processing the channels. Defaults
+                to one per channel. With a single worker the channels are
+                processed in the calling thread.
+            reuse_buffers (bool): Recycles the output arrays once the next block is processed.
+        """
         self.__channels = channels
         self.__rate = rate
         self.__frames_per_channel = frames_per_channel
         self.__filter_length = filter_length
         self.__aec = [EchoCanceller.create(frame_size=frames_per_channel,
                                            filter_length=filter_length,
-                                           sample_rate=rate)] * channels
+                                           sample_rate=rate) for _ in range(channels)]
+        self.__workers = min(workers if workers else channels, channels)
+        self.__executor = ThreadPoolExecutor(max_workers=self.__workers) if self.__workers > 1 else None
+        self.__near = np.empty(shape=[frames_per_channel, channels], dtype=np.int16)
+        self.__planar = np.empty(shape=[channels, frames_per_channel], dtype=np.int16)
+        self.__far = np.empty(shape=[frames_per_channel], dtype=np.int16)
+        self.__mono = np.empty(shape=[frames_per_channel], dtype=np.float32)
+        self.__reuse_buffers = reuse_buffers
+        self.__output = None
 
     @property
     def sample_rate(self) -> int:
@@ -24,30 +66,63 @@ class AEC:
         """ Returns the number of channels """
         return self.__channels
 
+    @property
+    def workers(self) -> int:
+        """ Returns the number of threads processing the channels """
+        return self.__workers
+
+    def close(self):
+        """Stops the threads processing the channels"""
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+            self.__workers = 1
 
     def process(self, data: np.ndarray, playback: np.ndarray) -> np.ndarray:
         """
         Removes the influence of the playback data from the recorded
         Args:
-            data: An array containing the data
-            playback: An array storing the played data
+            data: An array containing the data, [frames_per_channel, channels]
+            playback: An array storing the played data, [frames_per_channel] or
+                [frames_per_channel, playback channels]
 
         Returns:
             An array storing the final results
         """
+        if data.ndim > 1 and data.shape != (self.__frames_per_channel, self.channels):
+            raise ValueError("Invalid shape. Expected (%d, %d)" % (self.__frames_per_channel, self.channels))
+
+        if data.ndim == 1 and (data.size != self.__frames_per_channel or self.channels != 1):
+            raise ValueError("Invalid length. Expected %d samples" % self.__frames_per_channel)
+
+        if len(playback) != self.__frames_per_channel:
+            raise ValueError("Invalid playback length. Expected %d frames" % self.__frames_per_channel)
+
+        if playback.ndim > 1:
+            playback = np.mean(playback, axis=1, dtype=np.float32, out=self.__mono)
+        far = Converter.interleave(Converter.fromFloatToInt16(playback, out=self.__far))
 
-        if data.shape != [self.__frames_per_channel, self.channels]:
-            raise ValueError("Invalid shape. Expected (%d, %d)" % (self.channels, self.__frames_per_channel))
+        near = Converter.fromFloatToInt16(data.reshape(self.__near.shape), out=self.__near)
+        self.__planar[...] = Converter.toPlanar(near)
 
+        jobs = range(self.__channels)
+        if self.__executor is None:
+            results = [self.__cancel(channel, far) for channel in jobs]
+        else:
+            results = list(self.__executor.map(lambda channel: self.__cancel(channel, far), jobs))
 
-        mono_playback = np.mean(a=playback, axis=0, dtype=np.float32)
-        mono_playback = Converter.fromFloatToInt16(mono_playback)
+        for channel, fixed in enumerate(results):
+            self.__planar[channel] = np.frombuffer(fixed, dtype=np.int16)
+        output = None
+        if self.__reuse_buffers:
+            output = self.__output = BufferPool().recycle(self.__output, shape=self.__near.shape, dtype=np.float32)
+        return Converter.fromInt16ToFloat(Converter.toInterleaved(self.__planar), out=output).reshape(data.shape)
 
-        output = np.zeros(shape=[self.__frames_per_channel, self.channels], dtype=np.float32)
-        for i in range(self.__channels):
-            fixed = Converter.fromFloatToInt16(data[i][:])
-            fixed = Converter.interleave(fixed)
-            fixed = self.__aec[i].process_stream(fixed, mono_playback)
-            fixed = Converter.deinterleave(data=fixed, channels=1, frames_per_buffer=self.__frames_per_channel, dtype=np.int16)
-            output[i][:] = Converter.fromInt16ToFloat(fixed)
-        return output
\ No newline at end of file
+    def __cancel(self, channel: int, far: bytes) -> bytes:
+        """Runs the canceller of a channel over its planar samples
+
+        Args:
+            channel (int): Index of the channel
+            far (bytes): Played samples of the block, int16
+        """
+        return self.__aec[channel].process(Converter.interleave(self.__planar[channel]), far)
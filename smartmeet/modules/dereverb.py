@@ -10,6 +10,20 @@ class DeReverb():
     “Generalization of multi-channel linear prediction methods for blind MIMO impulse response shortening.”
     IEEE Transactions on Audio, Speech, and Language Processing 20.10 (2012): 2707-2720.
 
+    In online mode the prediction filter of every frequency bin is estimated
+    recursively (RLS) frame by frame, as in the frame-online WPE of nara_wpe.
+    The signal is analysed with a streaming STFT: the last `fft_size` samples
+    are kept in a preallocated buffer, every `fft_shift` samples a new frame is
+    transformed and stored in a ring of `taps + delay + 1` frames, and the
+    de-reverberated frames are resynthesised by weighted overlap-add. The
+    state does not depend on the length of the stream, so the memory stays
+    constant however long the meeting runs. The terms of the recursive update
+    are written into arrays allocated with the state, so a frame step only
+    allocates the small spectra of the STFT.
+
+    Note:
+        In online mode the data is laid out as [frames, channels] and the
+        output is delayed by `fft_size` samples.
     """
 
     def __init__(self,
@@ -17,7 +31,9 @@ class DeReverb():
                  fft_shift: int = 128,
                  iterations: int = 3,
                  delay: int = 3,
-                 taps: int = 10):
+                 taps: int = 10,
+                 online: bool = False,
+                 alpha: float = 0.9999):
         """
 
         Args:
@@ -26,13 +42,54 @@ class DeReverb():
             iterations (int): Number of iterations
             delay(int): Delay as a guard interval, such that the input data does not become zero.
             taps (int): Filter order
+            online (bool): Processes the signal frame by frame with a recursive estimation of the filter
+            alpha (float): Forgetting factor of the recursive estimation, close to 1
         """
+        if online and (fft_size % fft_shift or fft_size < 2 * fft_shift):
+            raise ValueError("The FFT-size must be a multiple of the FFT-shift of, at least, twice its value")
         self.taps = taps
         self.fft_size = fft_size
         self.fft_shift = fft_shift
         self.iterations = iterations
         self.delay = delay
+        self.online = online
+        self.alpha = alpha
+        # The squared root of a periodic Hann window is used for analysis and synthesis
+        self.__window = np.sin(np.pi * np.arange(fft_size) / fft_size)[:, np.newaxis]
+        self.__scale = 2.0 * fft_shift / fft_size
+        self.reset()
+
+    def reset(self):
+        """Discards the state of the online estimation"""
+        self.__channels = None
 
+    def __allocate(self, channels: int):
+        """Allocates the state of the online estimation for the given number of channels"""
+        bins = self.fft_size // 2 + 1
+        order = self.taps * channels
+        self.__channels = channels
+        self.__input = np.zeros(shape=[self.fft_size, channels], dtype=np.float64)
+        self.__output = np.zeros(shape=[self.fft_size, channels], dtype=np.float64)
+        self.__tail = np.zeros(shape=[self.fft_shift, channels], dtype=np.float64)
+        self.__fill = 0
+        self.__frames = np.zeros(shape=[self.taps + self.delay + 1, bins, channels], dtype=np.complex128)
+        self.__powers = np.zeros(shape=[self.taps + self.delay + 1, bins], dtype=np.float64)
+        self.__inv_cov = np.tile(np.eye(order, dtype=np.complex128), (bins, 1, 1))
+        self.__filter = np.zeros(shape=[bins, order, channels], dtype=np.complex128)
+        # Scratch arrays of the recursive update, so a frame step does not allocate the [bins, order, order] terms
+        self.__head = 0
+        self.__taken = np.empty(shape=[self.taps, bins, channels], dtype=np.complex128)
+        self.__past = np.empty(shape=[bins, channels, self.taps], dtype=np.complex128)
+        self.__past_conj = np.empty(shape=[bins, order], dtype=np.complex128)
+        self.__estimate = np.empty(shape=[bins, 1, channels], dtype=np.complex128)
+        self.__prediction = np.empty(shape=[bins, channels], dtype=np.complex128)
+        self.__prediction_conj = np.empty(shape=[bins, channels], dtype=np.complex128)
+        self.__nominator = np.empty(shape=[bins, order, 1], dtype=np.complex128)
+        self.__denominator = np.empty(shape=[bins, 1, 1], dtype=np.complex128)
+        self.__gain = np.empty(shape=[bins, order, 1], dtype=np.complex128)
+        self.__row = np.empty(shape=[bins, 1, order], dtype=np.complex128)
+        self.__update = np.empty(shape=[bins, order, order], dtype=np.complex128)
+        self.__filter_update = np.empty(shape=[bins, order, channels], dtype=np.complex128)
 
     def process(self, data: np.ndarray) -> np.ndarray:
         """
@@ -42,6 +99,87 @@ class DeReverb():
         Returns:
             Estimated signal with the same shape as data
         """
+        if self.online:
+            return self.__process_online(data)
         y = stft(time_signal=data, size=self.fft_size, shift=self.fft_shift)
         z = wpe(Y=y, iterations=self.iterations, delay=self.delay, taps=self.taps).transpose(1, 2, 0)
-        return istft(z, size=self.fft_size, shift=self.fft_shift)
\ No newline at end of file
+        return istft(z, size=self.fft_size, shift=self.fft_shift)
+
+    def __process_online(self, data: np.ndarray) -> np.ndarray:
+        """Feeds the streaming STFT with the samples and returns as many de-reverberated samples"""
+        frames = data.reshape(len(data), -1)
+        if self.__channels != frames.shape[1]:
+            self.__allocate(frames.shape[1])
+
+        shift = self.fft_shift
+        result = np.empty(shape=frames.shape, dtype=np.float64)
+        position = 0
+        while position < len(frames):
+            count = min(shift - self.__fill, len(frames) - position)
+            start = self.fft_size - shift + self.__fill
+            result[position:position + count] = self.__tail[self.__fill:self.__fill + count]
+            self.__input[start:start + count] = frames[position:position + count]
+            self.__fill += count
+            position += count
+            if self.__fill == shift:
+                self.__step()
+                self.__input[:-shift] = self.__input[shift:]
+                self.__fill = 0
+
+        if np.issubdtype(data.dtype, np.floating):
+            result = result.astype(data.dtype, copy=False)
+        return result.reshape(data.shape)
+
+    def __step(self):
+        """Analyses the newest frame, predicts its late reverberation and overlap-adds the estimation"""
+        shift = self.fft_shift
+        spectrum = np.fft.rfft(self.__input * self.__window, axis=0)
+        self.__head = (self.__head + 1) % len(self.__frames)
+        self.__frames[self.__head] = spectrum
+        # The power of the desired signal is estimated over the frames in the ring
+        self.__powers[self.__head] = np.mean(spectrum.real**2 + spectrum.imag**2, axis=1)
+        power = np.maximum(np.mean(self.__powers, axis=0), 1e-10)
+
+        estimation = self.__predict(power)
+
+        self.__output += np.fft.irfft(estimation, n=self.fft_size, axis=0) * self.__window
+        np.multiply(self.__output[:shift], self.__scale, out=self.__tail)
+        self.__output[:-shift] = self.__output[shift:]
+        self.__output[-shift:] = 0.0
+
+    def __predict(self, power: np.ndarray) -> np.ndarray:
+        """Performs a recursive update of the prediction filter of every bin
+
+        Args:
+            power (ndarray): Estimated power of the desired signal in every bin, [bins]
+
+        Returns:
+            The de-reverberated newest frame, [bins, channels]
+        """
+        bins = self.__frames.shape[1]
+        newest = self.__frames[self.__head]
+        # Past frames, from the newest to the oldest, skipping the delay: [bins, channels * taps]
+        ring = np.arange(self.__head - self.delay - 1, self.__head - self.delay - 1 - self.taps, -1) % len(self.__frames)
+        np.take(self.__frames, ring, axis=0, out=self.__taken)
+        np.copyto(self.__past, self.__taken.transpose(1, 2, 0))
+        window = self.__past.reshape(bins, -1)
+        window_conj = np.conjugate(window, out=self.__past_conj)
+
+        # window . conj(filter) is computed as conj(conj(window) . filter), without conjugating the filter
+        np.matmul(window_conj[:, np.newaxis, :], self.__filter, out=self.__estimate)
+        prediction = np.conjugate(self.__estimate[:, 0], out=self.__prediction)
+        np.subtract(newest, prediction, out=prediction)
+
+        # The outer products are computed by matmul, which writes into the preallocated arrays without buffering
+        nominator = np.matmul(self.__inv_cov, window[:, :, np.newaxis], out=self.__nominator)
+        denominator = np.matmul(window_conj[:, np.newaxis, :], nominator, out=self.__denominator)
+        denominator[:, 0, 0] += self.alpha * power
+        np.reciprocal(denominator, out=denominator)
+        gain = np.matmul(nominator, denominator, out=self.__gain)
+
+        row = np.matmul(window_conj[:, np.newaxis, :], self.__inv_cov, out=self.__row)
+        self.__inv_cov -= np.matmul(gain, row, out=self.__update)
+        self.__inv_cov /= self.alpha
+        prediction_conj = np.conjugate(prediction, out=self.__prediction_conj)
+        self.__filter += np.matmul(gain, prediction_conj[:, np.newaxis, :], out=self.__filter_update)
+        return prediction
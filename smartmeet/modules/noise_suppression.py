@@ -1,6 +1,6 @@
 import numpy as np
+from smartmeet.core.pool import BufferPool
 from smartmeet.utils.converter import Converter
-from profilehooks import profile
 from webrtc_audio_processing import AudioProcessingModule as AP
 
 class NoiseSuppressor:
@@ -10,15 +10,19 @@ class NoiseSuppressor:
 
     Notes:
         This algorithm implements a Noise Suppression technique, not Active Noise Cancellation.
+        By default every call returns a new array. When `reuse_buffers` is enabled, the output arrays are borrowed from
+        the BufferPool and given back on the next call, so an output is only valid until then. Enable it only when the
+        outputs are consumed before the next call, as in a pipeline.
 
     """
-    def __init__(self, rate: int, channels: int, level: int = 0):
+    def __init__(self, rate: int, channels: int, level: int = 0, reuse_buffers: bool = False):
         """Creates a noise suppression element with the given configuration
 
         Args:
             rate (int): The audio sample rate, in Hz.
             channels (int): Number of channels
             level (int):  Level of aggressiveness of the noise suppression algorithm.
+            reuse_buffers (bool): Recycles the output arrays once the next chunk is processed.
         """
         self.__channels = channels
         self.__rate = rate
@@ -26,6 +30,9 @@ class NoiseSuppressor:
         self.__ap = AP(enable_ns=True)
         self.__ap.set_ns_level(level)
         self.__ap.set_stream_format(rate, channels)
+        self.__fixed = np.empty(shape=[self.__frames_per_channel, channels], dtype=np.int16)
+        self.__reuse_buffers = reuse_buffers
+        self.__output = None
 
     @property
     def sample_rate(self) -> int:
@@ -57,7 +64,6 @@ class NoiseSuppressor:
         """
         self.__ap.set_ns_level(level)
 
-    @profile
     def process(self, data : np.ndarray) -> np.ndarray:
         """Applies a de-noising filter to the input data
 
@@ -73,16 +79,16 @@ class NoiseSuppressor:
             8KHz, the processing function is expecting an numpy.ndarray of shape
             [0.01 * SampleRate, Channels] = [80, 2]
         """
-        if data.ndim > 1 and data.shape != [self.__frames_per_channel, self.channels]:
+        if data.ndim > 1 and data.shape != (self.__frames_per_channel, self.channels):
             raise ValueError("Invalid shape. Expected (%d, %d)" % (self.__frames_per_channel, self.channels))
 
-        if data.ndim == 1 and data.size != self.__frames_per_channel:
+        if data.ndim == 1 and (data.size != self.__frames_per_channel or self.channels != 1):
             raise ValueError("Invalid length. Expected %d samples" % self.__frames_per_channel)
 
-        fixed = Converter.fromFloatToInt16(data)
-        fixed = bytearray(fixed.tostring())
-        #fixed = self.__ap.process_stream(stream=fixed)
-        print(type(fixed), len(fixed))
-        return fixed
-        #fixed = Converter.deinterleave(data=fixed, dtype=np.int16, channels=self.channels, frames_per_buffer=self.__frames_per_channel)
-        #return Converter.fromInt16ToFloat(fixed)
+        fixed = Converter.fromFloatToInt16(data.reshape(self.__fixed.shape), out=self.__fixed)
+        fixed = self.__ap.process_stream(Converter.interleave(fixed))
+        fixed = Converter.deinterleave(data=fixed, dtype=np.int16, channels=self.channels, frames_per_buffer=self.__frames_per_channel)
+        output = None
+        if self.__reuse_buffers:
+            output = self.__output = BufferPool().recycle(self.__output, shape=self.__fixed.shape, dtype=np.float32)
+        return Converter.fromInt16ToFloat(fixed, out=output).reshape(data.shape)
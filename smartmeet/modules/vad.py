@@ -1,6 +1,6 @@
 import numpy as np
+from smartmeet.io.decoder import Decoder
 from smartmeet.utils.converter import Converter
-from profilehooks import profile
 from webrtcvad import Vad
 
 class VAD:
@@ -33,6 +33,8 @@ class VAD:
         self.__rate = rate
         self.__mode = mode
         self.__vad = Vad(mode=mode)
+        self.__mono = None
+        self.__fixed = None
 
     @property
     def mode(self) -> int:
@@ -69,7 +71,6 @@ class VAD:
         self.__mode = mode
         self.__vad.set_mode(mode)
 
-    @profile
     def process(self, data: np.ndarray) -> bool:
         """Checks if the given data contains human speech.
 
@@ -81,8 +82,7 @@ class VAD:
 
         Notes:
             The input data must be an array of signed 16-bit samples or an array
-            of floating points storing values in the same range [-32,768,
-            32,768]
+            of floating points storing values in the range [-1, 1]
 
             Only mono frames with a length of 10, 20 or 30 ms are supported. For
             instance, if the class is using a sampling rate of 8KHz, the
@@ -91,10 +91,102 @@ class VAD:
             data. The signal may be down-mixed to a single channel before
             processing.
         """
-        mono = np.mean(a=data, axis=0, dtype=np.float32)
-        mono = Converter.fromFloatToInt16(mono)
-        mono = Converter.interleave(mono)
-        result = self.__vad.is_speech(buf=mono, sample_rate=self.sample_rate, length=mono.size())
+        fixed = self.__to_int16(data)
+        result = self.__vad.is_speech(buf=Converter.interleave(fixed), sample_rate=self.sample_rate, length=len(fixed))
         if (result < 0):
             raise RuntimeError("Invalid frame length. Only frames with a length of 10, 20 or 30 ms are supported.")
         return result
+
+    def segment(self, data, frame_duration: int = 30, hangover: int = 300) -> list:
+        """Finds the speech regions of a whole recording.
+
+        The recording is classified frame by frame: every frame is
+        down-mixed and converted to 16-bit samples in reused buffers, and
+        audio files are streamed by a Decoder one frame at a time, so the
+        memory used does not depend on the length of the recording. Speech
+        regions separated by less than `hangover` milliseconds are merged,
+        and every region is extended by `hangover` milliseconds to avoid
+        cutting the trailing part of the words. A trailing partial frame is
+        ignored.
+
+        Args:
+            data: An array of shape [Samples] or [Samples, Channels], or the
+                name of an audio file with the sampling rate of the detector.
+            frame_duration (int): Length of the classified frames in
+                milliseconds, must be 10, 20 or 30.
+            hangover (int): Hangover time in milliseconds.
+
+        Returns:
+            A list of (start, end) tuples with the speech regions in seconds.
+        """
+        if frame_duration not in (10, 20, 30):
+            raise ValueError("Invalid frame duration. Only frames of 10, 20 or 30 ms are supported.")
+
+        frame_length = self.sample_rate * frame_duration // 1000
+        if isinstance(data, str):
+            frames = self.__decode(file=data, frame_length=frame_length)
+        else:
+            frames = (data[i:i + frame_length] for i in range(0, len(data) - frame_length + 1, frame_length))
+        flags = np.fromiter((self.process(frame) for frame in frames), dtype=np.bool_)
+        return VAD.__merge(flags=flags, frame_duration=frame_duration, hangover=hangover)
+
+    def __decode(self, file: str, frame_length: int):
+        """Yields the complete frames of an audio file, reading a single frame at a time
+
+        Args:
+            file (str): Name of the audio file
+            frame_length (int): Number of frames per channel of every frame
+        """
+        decoder = Decoder(file=file, frames_per_buffer=frame_length, read_ahead=0)
+        try:
+            if decoder.sample_rate != self.sample_rate:
+                raise ValueError("Invalid sampling rate. Expected %d Hz, the file %s uses %d Hz" %
+                                 (self.sample_rate, file, decoder.sample_rate))
+            decoder.start()
+            while not decoder.done():
+                frame, extra = decoder.process()
+                if extra.get("valid_frames") is not None:
+                    return
+                yield frame
+        finally:
+            decoder.close()
+
+    @staticmethod
+    def __merge(flags: np.ndarray, frame_duration: int, hangover: int) -> list:
+        """Converts the per-frame decisions into merged speech regions
+
+        Args:
+            flags (np.ndarray): Boolean decision of every frame
+            frame_duration (int): Length of the frames in milliseconds
+            hangover (int): Hangover time in milliseconds
+        """
+        edges = np.diff(np.concatenate(([0], flags.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        extension = int(np.ceil(hangover / float(frame_duration)))
+
+        segments = []
+        for start, end in zip(starts, ends):
+            end = min(end + extension, len(flags))
+            if segments and start <= segments[-1][1]:
+                segments[-1][1] = max(segments[-1][1], end)
+            else:
+                segments.append([start, end])
+        return [(int(start) * frame_duration / 1000.0, int(end) * frame_duration / 1000.0) for start, end in segments]
+
+    def __to_int16(self, data: np.ndarray) -> np.ndarray:
+        """Down-mixes a frame and converts it to 16-bit samples reusing the
+        buffers of the previous frame"""
+        if data.ndim == 1 and data.dtype == np.int16:
+            return data
+        if self.__fixed is None or len(self.__fixed) != len(data):
+            self.__fixed = np.empty(shape=[len(data)], dtype=np.int16)
+        if data.ndim > 1:
+            if self.__mono is None or len(self.__mono) != len(data):
+                self.__mono = np.empty(shape=[len(data)], dtype=np.float32)
+            mono = np.mean(a=data, axis=1, dtype=np.float32, out=self.__mono)
+            if data.dtype == np.int16:
+                # 16-bit samples are down-mixed in the integer domain, they must not be scaled as floating point samples
+                return np.rint(mono, out=self.__fixed, casting='unsafe')
+            data = mono
+        return Converter.fromFloatToInt16(data, out=self.__fixed)
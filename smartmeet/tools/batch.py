@@ -0,0 +1,154 @@
+import glob
+import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib import import_module
+from time import perf_counter
+
+from smartmeet.core.pipeline import Pipeline
+from smartmeet.core.transform import Transform
+from smartmeet.filter.dc_removal import DCRemoval
+from smartmeet.io.decoder import Decoder
+from smartmeet.io.encoder import Encoder
+
+DEFAULT_FACTORY = "smartmeet.tools.batch:default_pipeline"
+EXTENSIONS = (".wav", ".flac", ".ogg", ".aiff", ".aif")
+
+
+def default_pipeline(input_file: str, output_file: str) -> Pipeline:
+    """Builds a DCRemoval -> NoiseSuppressor -> Encoder pipeline for the given files
+
+    A pipeline factory receives the input and output file names and returns a Pipeline whose source reads the input
+    file and whose sinks write the output file.
+
+    Args:
+        input_file (str): Audio file to process
+        output_file (str): Audio file storing the results
+    """
+    # webrtc_audio_processing is an optional dependency, only required by this factory
+    from smartmeet.modules.noise_suppression import NoiseSuppressor
+    decoder = Decoder(file=input_file)
+    pipeline = Pipeline(name=os.path.basename(input_file))
+    pipeline.add(decoder)
+    pipeline.add(Transform(DCRemoval(rate=decoder.sample_rate)))
+    pipeline.add(Transform(NoiseSuppressor(rate=decoder.sample_rate, channels=decoder.channels, reuse_buffers=True)))
+    pipeline.add(Encoder(file_name=output_file, rate=decoder.sample_rate, channels=decoder.channels, write_behind=True))
+    return pipeline
+
+
+def load_factory(spec: str):
+    """Returns the pipeline factory referenced as 'package.module:function'
+
+    Args:
+        spec (str): Reference to the factory
+    """
+    module, separator, attribute = spec.partition(":")
+    if not separator or not module or not attribute:
+        raise ValueError("Invalid factory '%s'. Expected 'package.module:function'" % spec)
+    return getattr(import_module(module), attribute)
+
+
+def find_files(patterns: list) -> list:
+    """Expands directories and glob patterns into a sorted list of audio files
+
+    Args:
+        patterns (list): Directories, files or glob patterns
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+            files.update(f for f in candidates if os.path.splitext(f)[1].lower() in EXTENSIONS)
+        else:
+            files.update(f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f))
+    return sorted(files)
+
+
+def process_file(factory: str, input_file: str, output_file: str) -> dict:
+    """Runs the pipeline built by the factory over a single file
+
+    This function is executed in the worker processes, so the factory is given by reference and resolved there.
+
+    Args:
+        factory (str): Reference to the pipeline factory, 'package.module:function'
+        input_file (str): Audio file to process
+        output_file (str): Audio file storing the results
+
+    Returns:
+        A dictionary with the file names, the duration of the audio, the processing time, the real-time factor and
+        the error message if the processing failed.
+    """
+    result = {"input": input_file, "output": output_file, "duration": 0.0, "elapsed": 0.0, "rtf": None, "error": None}
+    start = perf_counter()
+    pipeline = None
+    try:
+        pipeline = load_factory(factory)(input_file, output_file)
+        if not pipeline.run():
+            raise RuntimeError("The pipeline has been interrupted")
+        result["duration"] = pipeline.elements[0].timestamp()
+    except Exception as error:
+        result["error"] = "%s: %s" % (type(error).__name__, error)
+    finally:
+        for element in pipeline.elements if pipeline is not None else ():
+            close = getattr(element, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as error:
+                    result["error"] = result["error"] or "%s: %s" % (type(error).__name__, error)
+    result["elapsed"] = perf_counter() - start
+    if result["duration"] > 0:
+        result["rtf"] = result["elapsed"] / result["duration"]
+    return result
+
+
+def output_name(input_file: str, root: str, output_dir: str) -> str:
+    """Returns the output file name, keeping the layout of the input files relative to their common root"""
+    relative = os.path.relpath(input_file, root) if root else os.path.basename(input_file)
+    return os.path.join(output_dir, relative)
+
+
+def main(argv: list = None) -> int:
+    parser = ArgumentParser(description='Processes audio files in parallel with a pipeline per file.')
+    parser.add_argument('inputs', nargs='+', help='Directories, files or glob patterns of the files to process')
+    parser.add_argument('-o', '--output', required=True, dest='output', type=str, help='Output directory')
+    parser.add_argument('-f', '--factory', dest='factory', type=str, default=DEFAULT_FACTORY,
+                        help="Pipeline factory given as 'package.module:function'")
+    parser.add_argument('-j', '--jobs', dest='jobs', type=int, default=os.cpu_count(), help='Number of worker processes')
+    args = parser.parse_args(argv)
+
+    load_factory(args.factory)
+    files = find_files(args.inputs)
+    if not files:
+        print("No audio files found", file=sys.stderr)
+        return 1
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if len(files) > 1 else ""
+    outputs = [output_name(os.path.abspath(f), root, args.output) for f in files]
+    for output in outputs:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    start = perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [executor.submit(process_file, args.factory, f, o) for f, o in zip(files, outputs)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["error"]:
+                print("FAILED  %s: %s" % (result["input"], result["error"]))
+            else:
+                print("OK      %s \t Duration: %.2f s \t Elapsed: %.2f s \t RTF: %.4f" %
+                      (result["input"], result["duration"], result["elapsed"], result["rtf"] or 0.0))
+
+    elapsed = perf_counter() - start
+    failures = [r for r in results if r["error"]]
+    duration = sum(r["duration"] for r in results if not r["error"])
+    print("Processed %d files (%d failed) \t Audio: %.2f s \t Wall time: %.2f s \t Aggregate RTF: %.4f" %
+          (len(results), len(failures), duration, elapsed, elapsed / duration if duration else 0.0))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,26 @@
 import numpy as np
 
+from smartmeet.core.pool import BufferPool
+
 class DownMix:
-    """Converts a multi-channels data to mono"""
+    """Converts a multi-channels data to mono
+
+    By default every call returns a new array. When `reuse_buffers` is
+    enabled, the output arrays are borrowed from the BufferPool and the array
+    returned by `process` is given back to the pool on the next call, so it is
+    only valid until then. Enable it only when the outputs are consumed before
+    the next call, as in a pipeline.
+    """
+
+    def __init__(self, reuse_buffers: bool = False):
+        """Creates a DownMix element
+
+        Args:
+            reuse_buffers (bool): Recycles the output arrays once the next chunk is processed.
+        """
+        self.__reuse_buffers = reuse_buffers
+        self.__output = None
+
     def process(self, data: np.ndarray) -> np.ndarray:
         """Converts the multi-channel data into a mono signal :param data: N-D
         array representing the multi-channel audio data :param extra: Any
@@ -13,4 +32,9 @@ class DownMix:
         Returns:
             Mono version (average) of the original data.
         """
-        return np.mean(a=data, axis=0, dtype=np.float32)
\ No newline at end of file
+        if data.ndim == 1:
+            return data
+        if not self.__reuse_buffers:
+            return np.mean(a=data, axis=1, dtype=np.float32)
+        self.__output = BufferPool().recycle(self.__output, shape=data.shape[:1], dtype=np.float32)
+        return np.mean(a=data, axis=1, dtype=np.float32, out=self.__output)
@@ -1,3 +1,8 @@
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
 from scipy import signal
 from numpy import ndarray
 
@@ -7,19 +12,71 @@ class Resample:
     The input signal is up-sampled by the factor `up` , a zero-phase low-pass
     FIR filter is applied, and then it is down-sampled by the factor `down` .
     The resulting sample rate is ``up / down`` times the original sample rate.
-    Values beyond the boundary of the signal are assumed to be zero during the
-    filtering step.
+
+    The signal is processed as a stream. The polyphase filter bank is designed
+    once per (up, down) pair and shared by every instance, and the last input
+    samples of every channel are kept between calls, so the concatenation of
+    the chunks returned by `process` and `flush` matches the result of
+    resampling the whole signal at once. Values before the beginning of the
+    stream are assumed to be zero.
+
+    Note:
+        The number of samples returned for every chunk varies when the ratio
+        between the chunk size and `down` is not an integer, and the output
+        lags the input by the half-length of the filter. `flush` returns the
+        pending samples at the end of the stream.
+
+        When up and down are equal the chunks are returned unchanged, as
+        copies, and there are never pending samples.
     """
 
-    def __init__(self, up: int, down: int):
+    def __init__(self, up: int, down: int, axis: int = 0):
         """Create a Resample element.
 
         Args:
             up (int): The up-sampling factor.
             down (int): The down sampling factor.
+            axis (int): Axis of the frames in the input data, 0 for the
+                [frames, channels] layout
         """
+        if up < 1 or down < 1:
+            raise ValueError("The resampling factors must be positive numbers")
         self.up = up
         self.down = down
+        self.axis = axis
+        divisor = gcd(up, down)
+        self.__up = up // divisor
+        self.__down = down // divisor
+        self.__passthrough = self.__up == self.__down == 1
+        if not self.__passthrough:
+            self.__bank, self.__delay = Resample.__design(self.__up, self.__down)
+            self.__taps = self.__bank.shape[1]
+        self.__buffer = None
+        self.__consumed = 0
+        self.__produced = 0
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def __design(up: int, down: int) -> tuple:
+        """Designs the anti-aliasing filter used by scipy.signal.resample_poly
+
+        Returns:
+            The polyphase bank with the taps of every phase in reverse order, of
+            shape [up, taps], and the delay of the filter in up-sampled samples
+        """
+        max_rate = max(up, down)
+        half_length = 10 * max_rate
+        taps = signal.firwin(2 * half_length + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * up
+        taps = np.concatenate((taps, np.zeros(-len(taps) % up)))
+        bank = np.ascontiguousarray(taps.reshape(-1, up).T[:, ::-1])
+        bank.flags.writeable = False
+        return bank, half_length
+
+    def reset(self):
+        """Discards the history of the stream"""
+        self.__buffer = None
+        self.__consumed = 0
+        self.__produced = 0
 
     def process(self, data: ndarray) -> ndarray:
         """Resample the input data using polyphase filtering.
@@ -30,4 +87,65 @@ class Resample:
         Returns:
             An array containing the resampled signal.
         """
-        return signal.resample_poly(x=data, up=self.up, down=self.down)
+        if self.__passthrough:
+            return data.copy()
+        total = self.__consumed + data.shape[self.axis]
+        end = max(self.__produced, -((self.__delay - total * self.__up) // self.__down))
+        return self.__run(data, end)
+
+    def flush(self) -> ndarray:
+        """Returns the samples pending at the end of the stream
+
+        Returns:
+            An array containing the last resampled samples, or None if no data
+            has been processed.
+        """
+        if self.__passthrough or self.__buffer is None:
+            return None
+        end = -(-self.__consumed * self.__up // self.__down)
+        last = (max(end, 1) - 1) * self.__down + self.__delay
+        shape = list(self.__shape)
+        shape.insert(self.axis % (len(shape) + 1), max(0, last // self.__up - self.__consumed + 1))
+        result = self.__run(np.zeros(shape=shape, dtype=self.__buffer.dtype), end)
+        self.reset()
+        return result
+
+    def __run(self, data: ndarray, end: int) -> ndarray:
+        """Appends a chunk to the stream and computes the outputs [produced, end)"""
+        frames = np.moveaxis(data, self.axis, 0)
+        shape = frames.shape[1:]
+        frames = frames.reshape(frames.shape[0], -1)
+        self.__prepare(frames, shape)
+
+        history = self.__taps - 1
+        length = history + len(frames)
+        if len(self.__buffer) < length:
+            buffer = np.zeros(shape=[length, frames.shape[1]], dtype=self.__buffer.dtype)
+            buffer[:history] = self.__buffer[:history]
+            self.__buffer = buffer
+        self.__buffer[history:length] = frames
+
+        indexes = np.arange(self.__produced, end) * self.__down + self.__delay
+        starts = indexes // self.__up - self.__consumed
+        rows, channels = self.__buffer.strides
+        windows = as_strided(self.__buffer,
+                             shape=(length - history, self.__taps, frames.shape[1]),
+                             strides=(rows, rows, channels),
+                             writeable=False)
+        result = np.einsum('nkc,nk->nc', windows[starts], self.__filters[indexes % self.__up])
+
+        self.__buffer[:history] = self.__buffer[length - history:length]
+        self.__consumed += len(frames)
+        self.__produced = end
+        return np.moveaxis(result.reshape((len(result), ) + shape), 0, self.axis)
+
+    def __prepare(self, frames: ndarray, shape: tuple):
+        """Allocates the history of the stream on the first chunk"""
+        if self.__buffer is not None:
+            if shape != self.__shape:
+                raise ValueError("Invalid shape. Expected %s channels per frame" % (self.__shape, ))
+            return
+        dtype = frames.dtype if np.issubdtype(frames.dtype, np.floating) else np.float64
+        self.__shape = shape
+        self.__filters = self.__bank.astype(dtype)
+        self.__buffer = np.zeros(shape=[self.__taps - 1, frames.shape[1]], dtype=dtype)
@@ -1,7 +1,35 @@
+import threading
+
 import numpy as np
 
 
 class Converter:
+    """Conversions between sample formats and channel layouts.
+
+    Every conversion accepts an optional `out` buffer, so callers processing a stream of frames can reuse the same
+    output array and avoid an allocation per frame. The float to int16 conversion needs a float32 workspace, which is
+    cached per thread and per shape.
+
+    Float samples are mapped to int16 with a scale of 32768, values are clipped to [-32768, 32767]. The inverse
+    conversion divides by the same scale, so a round trip through int16 is lossless for int16 values.
+    """
+
+    __SCALE = 32768.0
+    __WORKSPACES = 8
+    __workspace = threading.local()
+
+    @staticmethod
+    def __scratch(shape: tuple) -> np.ndarray:
+        """Returns the float32 workspace of the calling thread for the given shape"""
+        buffers = getattr(Converter.__workspace, "buffers", None)
+        if buffers is None:
+            buffers = Converter.__workspace.buffers = dict()
+        buffer = buffers.get(shape)
+        if buffer is None:
+            if len(buffers) >= Converter.__WORKSPACES:
+                buffers.clear()
+            buffer = buffers[shape] = np.empty(shape=shape, dtype=np.float32)
+        return buffer
 
     @staticmethod
     def interleave(data: np.ndarray):
@@ -26,17 +54,103 @@ class Converter:
         return np.reshape(result, (frames_per_buffer, channels))
 
     @staticmethod
-    def fromFloatToInt16(data: np.ndarray) -> np.ndarray:
-        temp = data.copy()
-        temp[temp > 1.0] = 1.0
-        temp[temp < -1.0] = -1.0
-        temp[temp < 0] *= abs(np.iinfo(np.int16).min)
-        temp[temp > 0] *= abs(np.iinfo(np.int16).max)
-        return temp.astype(dtype=np.int16)
+    def asBuffer(data: np.ndarray) -> memoryview:
+        """Exposes the samples of an array as a flat byte buffer
+
+        The memory of C-contiguous arrays is shared with the returned memoryview, other arrays are copied once into a
+        contiguous array.
+
+        Args:
+            data (np.ndarray): Array to expose
+        """
+        return memoryview(np.ascontiguousarray(data)).cast('B')
+
+    @staticmethod
+    def toPlanar(data: np.ndarray) -> np.ndarray:
+        """Returns a [channels, frames] view of an interleaved [frames, channels] array without copying the samples
+
+        Args:
+            data (np.ndarray): Interleaved array
+        """
+        return data.T
+
+    @staticmethod
+    def toInterleaved(data: np.ndarray) -> np.ndarray:
+        """Returns a [frames, channels] view of a planar [channels, frames] array without copying the samples
+
+        Args:
+            data (np.ndarray): Planar array
+        """
+        return data.T
+
+    @staticmethod
+    def fromFloatToInt16(data: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Converts float samples in the range [-1, 1] to int16
+
+        Args:
+            data (np.ndarray): Float samples
+            out (np.ndarray): Optional int16 array with the same shape as data
+
+        Returns:
+            The converted samples, stored in `out` if given
+        """
+        if out is None:
+            out = np.empty(shape=data.shape, dtype=np.int16)
+        scratch = Converter.__scratch(data.shape)
+        np.clip(data, -1.0, (Converter.__SCALE - 1.0) / Converter.__SCALE, out=scratch)
+        np.multiply(scratch, Converter.__SCALE, out=out, casting='unsafe')
+        return out
+
+    @staticmethod
+    def fromInt16ToFloat(data: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Converts int16 samples to float32 samples in the range [-1, 1)
+
+        Args:
+            data (np.ndarray): Int16 samples
+            out (np.ndarray): Optional float32 array with the same shape as data
+
+        Returns:
+            The converted samples, stored in `out` if given
+        """
+        if out is None:
+            out = np.empty(shape=data.shape, dtype=np.float32)
+        np.multiply(data, np.float32(1.0 / Converter.__SCALE), out=out, dtype=np.float32)
+        return out
 
     @staticmethod
-    def fromInt16ToFloat(data: np.ndarray) -> np.ndarray:
-        temp = data.astype(dtype=np.float32)
-        temp[temp < 0] /= float(abs(np.iinfo(np.int16).min))
-        temp[temp > 0] /= float(abs(np.iinfo(np.int16).max))
-        return temp
+    def batchFromFloatToInt16(frames, out: np.ndarray = None) -> np.ndarray:
+        """Converts a batch of float frames to int16 in a single call
+
+        Args:
+            frames: Sequence of frames with the same shape, or an array whose first axis indexes the frames
+            out (np.ndarray): Optional int16 array of shape [len(frames), *frame_shape]
+
+        Returns:
+            The converted frames, stored in `out` if given
+        """
+        if isinstance(frames, np.ndarray):
+            return Converter.fromFloatToInt16(frames, out=out)
+        if out is None:
+            out = np.empty(shape=(len(frames), ) + np.shape(frames[0]), dtype=np.int16)
+        for index, frame in enumerate(frames):
+            Converter.fromFloatToInt16(frame, out=out[index])
+        return out
+
+    @staticmethod
+    def batchFromInt16ToFloat(frames, out: np.ndarray = None) -> np.ndarray:
+        """Converts a batch of int16 frames to float32 in a single call
+
+        Args:
+            frames: Sequence of frames with the same shape, or an array whose first axis indexes the frames
+            out (np.ndarray): Optional float32 array of shape [len(frames), *frame_shape]
+
+        Returns:
+            The converted frames, stored in `out` if given
+        """
+        if isinstance(frames, np.ndarray):
+            return Converter.fromInt16ToFloat(frames, out=out)
+        if out is None:
+            out = np.empty(shape=(len(frames), ) + np.shape(frames[0]), dtype=np.float32)
+        for index, frame in enumerate(frames):
+            Converter.fromInt16ToFloat(frame, out=out[index])
+        return out
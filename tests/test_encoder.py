@@ -0,0 +1,55 @@
+import numpy as np
+import soundfile
+
+from smartmeet.core.pipeline import Pipeline
+from smartmeet.core.transform import Transform
+from smartmeet.io.decoder import Decoder
+from smartmeet.io.encoder import Encoder
+from smartmeet.tools.resample import Resample
+
+
+def test_decode_encode_drops_only_the_padding(tmpdir):
+    data = np.random.RandomState(0).uniform(-0.5, 0.5, (16037, 2)).astype(np.float32)
+    soundfile.write(str(tmpdir.join("input.wav")), data, 16000, subtype="FLOAT")
+
+    for write_behind in (False, True):
+        output = str(tmpdir.join("output-%d.wav" % write_behind))
+        decoder = Decoder(str(tmpdir.join("input.wav")), frames_per_buffer=160)
+        encoder = Encoder(output, rate=16000, channels=2, write_behind=write_behind)
+        decoder.link(encoder)
+        assert Pipeline.exec(source=decoder)
+        encoder.close()
+        assert soundfile.info(output).frames == len(data)
+
+
+def test_resample_then_encode_keeps_every_frame(tmpdir):
+    data = np.random.RandomState(0).uniform(-0.5, 0.5, 16000).astype(np.float32)
+    soundfile.write(str(tmpdir.join("input.wav")), data, 16000, subtype="FLOAT")
+
+    output = str(tmpdir.join("output.wav"))
+    decoder = Decoder(str(tmpdir.join("input.wav")), frames_per_buffer=160)
+    resample = Transform(Resample(up=3, down=1))
+    encoder = Encoder(output, rate=48000, channels=1)
+    decoder.link(resample)
+    resample.link(encoder)
+    assert Pipeline.exec(source=decoder)
+    encoder.close()
+
+    # The samples delayed by the resampling filter are only returned by flush
+    reference = Resample(up=3, down=1)
+    expected = sum(len(reference.process(data[i:i + 160])) for i in range(0, len(data), 160))
+    assert expected > 3 * len(data) - 100
+    assert soundfile.info(output).frames == expected
+
+
+def test_write_behind_int16(tmpdir):
+    data = np.random.RandomState(0).randint(-32768, 32767, size=(16037, 2)).astype(np.int16)
+
+    for write_behind in (False, True):
+        output = str(tmpdir.join("output-%d.wav" % write_behind))
+        encoder = Encoder(output, rate=16000, channels=2, write_behind=write_behind, batch_frames=1000)
+        for i in range(0, len(data), 160):
+            encoder.process(data[i:i + 160])
+        encoder.close()
+        written, _ = soundfile.read(output, dtype="int16")
+        np.testing.assert_array_equal(written, data)
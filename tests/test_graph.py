@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pytest
+import soundfile
+
+from smartmeet.core.graph import Graph
+from smartmeet.core.join import Join
+from smartmeet.core.sink import Sink
+from smartmeet.io.array_source import ArraySource
+from smartmeet.io.decoder import Decoder
+
+
+class Collector(Sink):
+    """Stores a copy of every received chunk, slowly enough to let the producers run ahead"""
+
+    def __init__(self, name: str, delay: float = 0.0):
+        super().__init__(name)
+        self.items = []
+        self.delay = delay
+
+    def process(self, data, extra):
+        time.sleep(self.delay)
+        self.items.append(tuple(np.array(value) for value in data))
+
+
+def test_parallel_join_fan_out_keeps_the_chunks_intact():
+    frames, count = 160, 50
+    mic = np.arange(frames * count, dtype=np.float32).reshape(-1, 1)
+    loopback = -mic
+    first, second = Collector("first", 0.002), Collector("second", 0.002)
+
+    graph = Graph(parallel=True)
+    join = Join(ports=("mic", "loopback"))
+    graph.connect(ArraySource(mic, rate=16000, frames_per_buffer=frames), join, "mic")
+    graph.connect(ArraySource(loopback, rate=16000, frames_per_buffer=frames), join, "loopback")
+    graph.connect(join, first)
+    graph.connect(join, second)
+    assert graph.run()
+
+    for collector in (first, second):
+        assert len(collector.items) == count
+        for index, (near, far) in enumerate(collector.items):
+            expected = mic[index * frames:(index + 1) * frames]
+            np.testing.assert_array_equal(near, expected)
+            np.testing.assert_array_equal(far, -expected)
+
+
+class Failing(Sink):
+    """Raises once it has received the given number of chunks"""
+
+    def __init__(self, count: int):
+        super().__init__("failing")
+        self.count = count
+
+    def process(self, data, extra):
+        self.count -= 1
+        if not self.count:
+            raise RuntimeError("failing sink")
+
+
+def test_fan_in_requires_a_join():
+    data = np.zeros(shape=[1600, 1], dtype=np.float32)
+    first, second = ArraySource(data, rate=16000), ArraySource(data, rate=16000)
+    sink, join = Collector("sink"), Join(ports=("mic", "loopback"))
+
+    graph = Graph()
+    graph.connect(first, sink)
+    with pytest.raises(ValueError):
+        graph.connect(second, sink)
+    graph.connect(first, join, "mic")
+    with pytest.raises(ValueError):
+        graph.connect(second, join, "mic")
+    graph.connect(second, join, "loopback")
+
+
+def test_failing_branch_stops_the_other_sources(tmpdir):
+    data = np.random.RandomState(0).uniform(-0.5, 0.5, (160000, 1)).astype(np.float32)
+    soundfile.write(str(tmpdir.join("input.wav")), data, 16000, subtype="FLOAT")
+
+    graph = Graph()
+    graph.connect(Decoder(str(tmpdir.join("input.wav")), frames_per_buffer=160), Failing(count=10))
+    graph.connect(Decoder(str(tmpdir.join("input.wav")), frames_per_buffer=160), Collector("slow", 0.01))
+    start = time.time()
+    with pytest.raises(RuntimeError):
+        graph.run()
+    assert time.time() - start < 5.0
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from smartmeet.filter.pre_emphasis import DeEmphasis, PreEmphasis
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_de_emphasis_inverts_pre_emphasis(dtype):
+    data = np.random.RandomState(0).uniform(-0.5, 0.5, (1600, 2)).astype(dtype)
+    pre, de = PreEmphasis(cof=0.95), DeEmphasis(cof=0.95)
+    chunks = [de.process(pre.process(data[i:i + 160])) for i in range(0, len(data), 160)]
+
+    for chunk in chunks:
+        assert chunk.dtype == dtype
+    np.testing.assert_allclose(np.concatenate(chunks), data, atol=1e-5 if dtype == np.float32 else 1e-12)
+
+
+def test_integer_input_is_filtered_in_double_precision():
+    data = np.arange(160, dtype=np.int16).reshape(-1, 2)
+    assert PreEmphasis().process(data).dtype == np.float64
+    assert DeEmphasis().process(data).dtype == np.float64
@@ -0,0 +1,56 @@
+import numpy as np
+import soundfile
+
+from smartmeet.core.pipeline import Pipeline
+from smartmeet.core.reframer import Reframer
+from smartmeet.core.sink import Sink
+from smartmeet.core.transform import Transform
+from smartmeet.io.decoder import Decoder
+from smartmeet.tools.resample import Resample
+
+
+class Collector(Sink):
+    """Stores a copy of every received frame"""
+
+    def __init__(self):
+        super().__init__("collector")
+        self.frames = []
+
+    def process(self, data, extra):
+        assert "valid_frames" not in extra
+        self.frames.append(np.array(data))
+
+
+def test_reframe_drops_only_the_padding(tmpdir):
+    data = np.random.RandomState(0).uniform(-0.5, 0.5, 16037).astype(np.float32)
+    soundfile.write(str(tmpdir.join("input.wav")), data, 16000, subtype="FLOAT")
+
+    decoder = Decoder(str(tmpdir.join("input.wav")), frames_per_buffer=160)
+    reframer = Reframer(frame_size=100)
+    collector = Collector()
+    decoder.link(reframer)
+    reframer.link(collector)
+    assert Pipeline.exec(source=decoder)
+
+    assert len(collector.frames) == len(data) // 100
+    assert reframer.pending == len(data) % 100
+    np.testing.assert_allclose(np.concatenate(collector.frames).ravel(), data[:len(collector.frames) * 100], atol=1e-4)
+
+
+def test_upsample_then_reframe_keeps_every_sample(tmpdir):
+    data = np.random.RandomState(0).uniform(-0.5, 0.5, 16000).astype(np.float32)
+    soundfile.write(str(tmpdir.join("input.wav")), data, 16000, subtype="FLOAT")
+
+    decoder = Decoder(str(tmpdir.join("input.wav")), frames_per_buffer=160)
+    resample = Transform(Resample(up=3, down=1))
+    reframer = Reframer(frame_size=480)
+    collector = Collector()
+    decoder.link(resample)
+    resample.link(reframer)
+    reframer.link(collector)
+    assert Pipeline.exec(source=decoder)
+
+    reference = Resample(up=3, down=1)
+    expected = np.concatenate([reference.process(data[i:i + 160]) for i in range(0, len(data), 160)])
+    assert len(collector.frames) == len(expected) // 480
+    np.testing.assert_allclose(np.concatenate(collector.frames).ravel(), expected[:len(collector.frames) * 480], atol=1e-4)
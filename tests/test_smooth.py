@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from smartmeet.filter.smooth import Smooth
+
+
+@pytest.mark.parametrize("kernel_size", [5, 11, 31])
+def test_matches_savgol_filter_for_odd_kernels(kernel_size):
+    data = np.random.RandomState(0).randn(4000, 2)
+    smooth = Smooth(kernel_size=kernel_size, polyorder=3)
+    result = np.concatenate([smooth.process(data[i:i + 160]) for i in range(0, len(data), 160)])
+
+    # The stream is delayed by half the window, the edges of savgol_filter are interpolated
+    half = (kernel_size - 1) // 2
+    expected = signal.savgol_filter(data, kernel_size, 3, axis=0)
+    np.testing.assert_allclose(result[2 * half:], expected[half:-half], atol=1e-10)
+
+
+@pytest.mark.parametrize("kernel_size", [4, 10, 30])
+def test_rejects_even_kernels(kernel_size):
+    with pytest.raises(ValueError):
+        Smooth(kernel_size=kernel_size, polyorder=3)
+
+
+def test_keeps_the_floating_point_type():
+    data = np.random.RandomState(0).randn(160, 2).astype(np.float32)
+    assert Smooth(kernel_size=11, polyorder=3).process(data).dtype == np.float32